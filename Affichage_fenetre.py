@@ -0,0 +1,167 @@
+"""
+Nom du fichier : Affichage_fenetre.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Ce script sépare l'affichage de la boucle de contrôle. La boucle principale dépose seulement l'état à
+    afficher (détections, position du joueur, difficulté...) ; l'image est composée et affichée
+    au plus à la fréquence choisie et toujours avec le dernier état déposé. Les états déposés entre deux
+    affichages sont abandonnés : une fenêtre lente ne ralentit plus le suivi du joueur ni l'envoi des
+    données au lanceur.
+    Les fenêtres OpenCV sont toujours gérées par le fil principal (lors du dépôt de l'état) ; la composition de
+    l'image (vues des caméras, textes, terrain) est faite par un fil séparé, la boucle principale ne faisant
+    qu'afficher l'image déjà composée.
+"""
+
+import time
+import threading
+import cv2
+import numpy as np
+
+class CompositeCanvas:
+    """
+    Classe regroupant l'image composite affichée, allouée une seule fois : le terrain fictif à gauche et les vues
+    des caméras gauche et droite l'une au-dessus de l'autre à droite.
+
+    Le terrain et les vues sont dessinés directement dans les parties 'court', 'view_left' et 'view_right'
+    (vues numpy de 'image'), ce qui remplace la création d'une nouvelle image par hconcat/vconcat à chaque affichage.
+    """
+    def __init__(self, court_shape, view_size=(1920,1080)):
+        court_height, court_width = court_shape[:2]
+        view_width, view_height = view_size
+
+        self.image = np.zeros((max(court_height, 2*view_height), court_width + view_width, 3), dtype=np.uint8)
+        self.court = self.image[:court_height, :court_width]
+        self.view_left = self.image[:view_height, court_width:]
+        self.view_right = self.image[view_height:2*view_height, court_width:]
+
+class DisplayConsumer:
+    """
+    Classe affichant le dernier état déposé par la boucle principale, au plus 'rate' fois par seconde.
+
+    'render' est la fonction qui compose l'image à partir d'un état, avec des états qui ne sont plus modifiés
+    après leur dépôt. Les fenêtres OpenCV (imshow, waitKey, destroyWindow) ne sont manipulées que par le fil
+    principal, lors du dépôt d'un état : HighGUI n'est pas prévu pour être appelé depuis un autre fil.
+    Avec 'threaded', seule la composition de l'image est confiée à un fil séparé ; l'image composée attend
+    d'être affichée par le fil principal avant que le fil en compose une nouvelle (l'image peut donc être
+    écrite en place dans une image préallouée). L'attribut 'escape' passe à True lorsque l'utilisateur
+    appuie sur 'Échap' dans la fenêtre.
+    """
+    def __init__(self, render, window_name, rate=30, threaded=True):
+        self.render = render                # Fonction état -> image
+        self.window_name = window_name      # Nom de la fenêtre
+        self.period = 1/rate if rate else 0 # Durée minimale entre deux affichages (en s)
+        self.threaded = threaded            # Composition de l'image dans un fil séparé
+
+        self.state = None        # Dernier état déposé
+        self.submitted = 0       # Nombre d'états déposés
+        self.displayed = 0       # Nombre d'états affichés
+        self.shown_index = 0     # Numéro du dernier état affiché
+        self.last_display = 0    # Instant du dernier affichage
+        self.last_key = 0        # Instant de la dernière lecture du clavier
+        self.escape = False      # True si l'utilisateur a appuyé sur 'Échap'
+        self.error = None        # Exception levée pendant la composition
+
+        self.image = None        # Image composée par le fil, en attente d'affichage
+        self.image_index = 0     # Numéro de l'état de la dernière image composée
+        self.render_time = 0     # Durée de la dernière composition (en s)
+
+        self.running = True
+        self.new_state = threading.Condition()
+        if self.threaded:
+            self.thread_render = threading.Thread(target=self.render_continuously, daemon=True)
+            self.thread_render.start()
+
+    @property
+    def dropped(self):
+        """Nombre d'états déposés qui n'ont jamais été affichés"""
+        return self.submitted - self.displayed
+
+    def submit(self, state):
+        """
+        Dépose le nouvel état à afficher (l'état précédent non affiché est abandonné), puis affiche la dernière
+        image si besoin. Doit être appelée par le fil principal.
+        """
+        with self.new_state:
+            self.state = state
+            self.submitted += 1
+            self.new_state.notify()
+
+        # Avec fil, l'image est affichée dès qu'elle est composée ; sans fil, elle est composée puis affichée si la période est écoulée
+        if self.threaded or time.monotonic() - self.last_display >= self.period:
+            self.display_latest()
+
+    def compose(self, state):
+        """Compose l'image d'un état, ou retourne None (et demande l'arrêt) si la composition échoue"""
+        start = time.monotonic()
+        try:
+            image = self.render(state)
+        except Exception as error:
+            # L'erreur est signalée à la boucle principale qui s'arrête proprement
+            self.error = error
+            self.escape = True
+            print(f"\n\033[31mErreur lors de l'affichage : {error}\033[0m\n")
+            return None
+        self.render_time = time.monotonic() - start
+        return image
+
+    def display_latest(self):
+        """Affiche la dernière image si elle n'a pas encore été affichée, puis lit le clavier (fil principal uniquement)"""
+        start = time.monotonic()  # La période d'affichage est comptée depuis le début de la composition
+        with self.new_state:
+            if self.threaded:
+                image, index = self.image, self.image_index
+            else:
+                state, index = self.state, self.submitted
+        if not self.threaded:
+            self.last_display = start
+            image = self.compose(state) if index != self.shown_index else None
+
+        shown = image is not None and index != self.shown_index
+        if shown:
+            cv2.imshow(self.window_name, image)
+            self.shown_index = index
+            self.displayed += 1
+            if self.threaded:
+                # L'image a été copiée par imshow : le fil peut composer l'état suivant
+                with self.new_state:
+                    self.last_display = start
+                    self.image = None
+                    self.new_state.notify()
+
+        # Vérifie si l'utilisateur appuie sur la touche 'Échap' (au plus une fois par période sans nouvelle image)
+        if shown or start - self.last_key >= self.period:
+            self.last_key = start
+            if cv2.waitKey(1) == 27:
+                self.escape = True
+
+    def render_continuously(self):
+        """Boucle du fil de composition : attend un nouvel état et l'affichage de l'image précédente, respecte la période puis compose"""
+        while self.running and self.error is None:
+            with self.new_state:
+                ready = self.new_state.wait_for(lambda: (self.image is None and self.submitted != self.image_index) or not self.running, timeout=max(self.period, 0.01))
+            if not ready or not self.running:
+                continue
+
+            # L'image est prête au moment où la période d'affichage se termine
+            delay = self.last_display + self.period - self.render_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self.new_state:
+                state, index = self.state, self.submitted
+            image = self.compose(state)
+            if image is None:
+                break
+            with self.new_state:
+                self.image, self.image_index = image, index
+
+    def close(self):
+        """Arrête le fil de composition puis ferme la fenêtre (fil principal uniquement)"""
+        self.running = False
+        if self.threaded:
+            with self.new_state:
+                self.new_state.notify()
+            self.thread_render.join(timeout=1)
+        if self.displayed:
+            cv2.destroyWindow(self.window_name)
@@ -0,0 +1,211 @@
+"""
+Nom du fichier : Balistique_volant.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Ce script calcule l'altitude (angle d'élévation) et la puissance à envoyer au lanceur pour que le volant
+    arrive sur une position cible du terrain. La trajectoire du volant est freinée par l'air (traînée
+    quadratique, vitesse limite d'environ 6,8 m/s), ce qui est trop long à résoudre à chaque image : toutes
+    les trajectoires sont simulées une seule fois et résumées dans une table (distance -> altitude, puissance,
+    temps de vol), enregistrée sur le disque pour chaque jeu de paramètres du lanceur, puis interpolée pendant
+    la boucle principale.
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+
+gravity = 9.81  # Accélération de la pesanteur (en m/s²)
+
+# Paramètres du lanceur et du volant (modifier un paramètre entraîne le calcul d'une nouvelle table)
+launcher_parameters = {
+    "height_launcher": 1.0,       # Hauteur de sortie du volant (en m)
+    "height_target": 1.2,         # Hauteur à laquelle le volant doit arriver sur la cible (en m)
+    "terminal_velocity": 6.8,     # Vitesse limite de chute du volant (en m/s)
+    "speed_max": 40.0,            # Vitesse de sortie du volant à 100 % de puissance (en m/s)
+    "angle_min": 0.0,             # Altitude minimale du lanceur (en degrés)
+    "angle_max": 60.0,            # Altitude maximale du lanceur (en degrés)
+    "distance_max": 15000,        # Distance maximale de la table (en mm)
+    "distance_step": 50,          # Pas de la table (en mm)
+}
+
+# Réglages de la simulation (font aussi partie de la clé de la table : les modifier entraîne un nouveau calcul)
+simulation_settings = {
+    "dt": 0.002,                  # Pas d'intégration des trajectoires (en s)
+    "duration": 6.0,              # Durée maximale simulée d'une trajectoire (en s)
+    "angle_step": 0.5,            # Pas des altitudes simulées (en degrés)
+    "speed_count": 160,           # Nombre de vitesses de sortie simulées
+}
+
+cache_folder = "Cache_balistique"  # Dossier des tables déjà calculées
+
+# =========================================================================================== #
+#                              1. Simulation des trajectoires                                 #
+# =========================================================================================== #
+
+def simulate_trajectories(angles, speeds, parameters, dt=simulation_settings["dt"], duration=simulation_settings["duration"]):
+    """
+    Simule en une seule fois les trajectoires de toutes les combinaisons (altitude, vitesse de sortie).
+
+    Le volant est soumis à la pesanteur et à une traînée quadratique a = -g |v| v / vt², intégrées par la
+    méthode du point milieu. On relève, pour chaque trajectoire, la distance horizontale et l'instant où le
+    volant redescend à la hauteur de la cible.
+
+    Paramètres :
+    angles : np.ndarray
+        Altitudes de sortie (en rad).
+    speeds : np.ndarray
+        Vitesses de sortie (en m/s).
+
+    Retourne :
+    tuple (np.ndarray, np.ndarray)
+        Distances (en m) et temps de vol (en s) de forme (nombre d'altitudes, nombre de vitesses), NaN si le
+        volant n'atteint pas la hauteur de la cible en descendant.
+    """
+    drag = gravity/parameters["terminal_velocity"]**2
+    height_target = parameters["height_target"]
+
+    angle_grid, speed_grid = np.meshgrid(angles, speeds, indexing="ij")
+    x = np.zeros(angle_grid.shape)
+    z = np.full(angle_grid.shape, parameters["height_launcher"], dtype=np.float64)
+    vx = speed_grid*np.cos(angle_grid)
+    vz = speed_grid*np.sin(angle_grid)
+
+    distances = np.full(angle_grid.shape, np.nan)
+    flight_times = np.full(angle_grid.shape, np.nan)
+    active = np.ones(angle_grid.shape, dtype=bool)
+
+    def acceleration(vx, vz):
+        speed = np.hypot(vx, vz)
+        return -drag*speed*vx, -gravity - drag*speed*vz
+
+    for step in range(int(duration/dt)):
+        ax, az = acceleration(vx, vz)
+        vx_mid, vz_mid = vx + ax*dt/2, vz + az*dt/2
+        ax, az = acceleration(vx_mid, vz_mid)
+
+        x_new, z_new = x + vx_mid*dt, z + vz_mid*dt
+        vx, vz = vx + ax*dt, vz + az*dt
+
+        # Passage à la hauteur de la cible en descendant : interpolation linéaire sur le pas
+        crossing = active & (z >= height_target) & (z_new < height_target) & (vz < 0)
+        if crossing.any():
+            ratio = (z[crossing] - height_target)/(z[crossing] - z_new[crossing])
+            distances[crossing] = x[crossing] + ratio*(x_new[crossing] - x[crossing])
+            flight_times[crossing] = (step + ratio)*dt
+            active &= ~crossing
+
+        x, z = x_new, z_new
+        if not (active & (z > -1)).any():
+            break
+
+    return distances, flight_times
+
+# =========================================================================================== #
+#                                   2. Table balistique                                       #
+# =========================================================================================== #
+
+def parameters_key(parameters, settings=simulation_settings):
+    """Retourne une clé courte identifiant un jeu de paramètres et les réglages de la simulation (nom du fichier de la table)"""
+    return hashlib.sha1(json.dumps({"parameters": parameters, "simulation": settings}, sort_keys=True).encode()).hexdigest()[:12]
+
+def compute_table(parameters, settings=simulation_settings):
+    """
+    Calcule la table balistique : pour chaque distance, l'altitude demandant la plus faible vitesse de sortie
+    (trajectoire la plus douce), cette vitesse en puissance (en %) et le temps de vol.
+
+    Les distances inatteignables reprennent les valeurs de la distance atteignable la plus proche et sont
+    signalées dans le tableau "reachable".
+
+    Retourne :
+    dict
+        Tableaux "distances" (en mm), "altitudes" (en degrés), "powers" (en %), "flight_times" (en s) et
+        "reachable" (True si la distance est atteignable).
+    """
+    angle_step = settings["angle_step"]
+    angles = np.radians(np.arange(parameters["angle_min"], parameters["angle_max"] + angle_step/2, angle_step))
+    speeds = np.linspace(0.5, parameters["speed_max"], settings["speed_count"])
+    distances_simulated, times_simulated = simulate_trajectories(angles, speeds, parameters, settings["dt"], settings["duration"])
+
+    distances = np.arange(0, parameters["distance_max"] + parameters["distance_step"], parameters["distance_step"], dtype=np.float64)
+    target = distances/1000  # Distances en m
+
+    # Pour chaque altitude, la distance augmente avec la vitesse : inversion distance -> vitesse par interpolation
+    speeds_needed = np.full((len(angles), len(target)), np.nan)
+    times_needed = np.full((len(angles), len(target)), np.nan)
+    for i in range(len(angles)):
+        valid = np.isfinite(distances_simulated[i])
+        if valid.sum() < 2:
+            continue
+        reached, speed_valid, time_valid = distances_simulated[i][valid], speeds[valid], times_simulated[i][valid]
+        increasing = np.concatenate([[True], np.diff(reached) > 0])
+        reached, speed_valid, time_valid = reached[increasing], speed_valid[increasing], time_valid[increasing]
+        inside = (target >= reached[0]) & (target <= reached[-1])
+        speeds_needed[i, inside] = np.interp(target[inside], reached, speed_valid)
+        times_needed[i, inside] = np.interp(target[inside], reached, time_valid)
+
+    # Altitude de plus faible vitesse pour chaque distance atteignable
+    reachable = np.isfinite(speeds_needed).any(axis=0)
+    best = np.argmin(np.where(np.isfinite(speeds_needed), speeds_needed, np.inf), axis=0)
+    columns = np.arange(len(target))
+
+    altitudes = np.degrees(angles[best])
+    powers = 100*speeds_needed[best, columns]/parameters["speed_max"]
+    flight_times = times_needed[best, columns]
+
+    # Distances inatteignables : valeurs de la distance atteignable la plus proche
+    if reachable.any():
+        nearest = np.flatnonzero(reachable)[np.argmin(np.abs(np.flatnonzero(reachable)[None,:] - columns[:,None]), axis=1)]
+        altitudes, powers, flight_times = altitudes[nearest], powers[nearest], flight_times[nearest]
+    else:
+        altitudes, powers, flight_times = np.zeros(len(target)), np.zeros(len(target)), np.zeros(len(target))
+
+    return {"distances": distances, "altitudes": altitudes, "powers": powers, "flight_times": flight_times, "reachable": reachable}
+
+class BallisticsTable:
+    """
+    Classe donnant l'altitude, la puissance et le temps de vol du volant pour une position cible du terrain,
+    par interpolation dans la table balistique.
+
+    La trajectoire ne dépend que de la distance horizontale entre le lanceur et la cible (l'azimut est réglé
+    séparément), la table est donc indexée par cette distance.
+    """
+    def __init__(self, table):
+        self.distances = table["distances"]
+        self.altitudes = table["altitudes"]
+        self.powers = table["powers"]
+        self.flight_times = table["flight_times"]
+        self.reachable = table["reachable"]
+
+    def lookup(self, depth, width):
+        """
+        Retourne l'altitude (en degrés), la puissance (en %) et le temps de vol (en s) pour atteindre la
+        position (profondeur, largeur) en mm dans le repère du lanceur, ainsi que True si cette position est
+        atteignable. Sinon, les valeurs sont celles de la distance atteignable la plus proche.
+        """
+        distance = np.hypot(depth, width)
+        altitude = np.interp(distance, self.distances, self.altitudes)
+        power = np.interp(distance, self.distances, self.powers)
+        flight_time = np.interp(distance, self.distances, self.flight_times)
+
+        # Atteignable si les deux points de la table qui encadrent la distance le sont (au-delà de la table : non)
+        index = min(max(np.searchsorted(self.distances, distance), 1), len(self.distances)-1)
+        reachable = distance <= self.distances[-1] and self.reachable[index-1] and self.reachable[index]
+        return altitude, power, flight_time, bool(reachable)
+
+def ballistics_table(parameters=launcher_parameters, folder=cache_folder, settings=simulation_settings):
+    """
+    Retourne la table balistique des paramètres donnés, calculée au premier appel puis relue sur le disque.
+    """
+    path = os.path.join(folder, f"Balistique_{parameters_key(parameters, settings)}.npz")
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return BallisticsTable({key: data[key] for key in data.files})
+
+    print("Calcul de la table balistique du volant...")
+    table = compute_table(parameters, settings)
+    os.makedirs(folder, exist_ok=True)
+    np.savez(path, **table)
+    print(f"Table balistique enregistrée dans \033[34m{path}\033[0m")
+    return BallisticsTable(table)
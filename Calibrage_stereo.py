@@ -0,0 +1,264 @@
+"""
+Nom du fichier : Calibrage_stereo.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Ce script calibre les deux caméras à partir de photos simultanées d'un damier : paramètres intrinsèques
+    (focale, centre optique), distorsion de chaque objectif et translation entre les deux caméras. Le calibrage
+    est enregistré dans un fichier, puis relu par le programme principal qui en déduit les champs de vision et
+    la distance entre les caméras, sans mesure manuelle.
+    Seuls les paramètres intrinsèques et la distance entre les caméras sont utilisés : l'orientation des
+    caméras reste celle du modèle de Variables_positions.py (angle_base_camera()), les images ne sont pas rectifiées.
+    Les tables de correction (remap) sont calculées une seule fois au chargement ; à l'exécution, seule la
+    position détectée du joueur est corrigée (ou l'image entière si besoin, avec un seul remap).
+
+    Utilisation : lancer ce script, présenter le damier aux deux caméras dans différentes positions et appuyer
+    sur 'c' pour chaque capture, puis sur 'Échap' pour calculer et enregistrer le calibrage.
+"""
+
+import os
+import cv2
+import numpy as np
+
+chessboard_size = (9,6)                     # Nombre de coins intérieurs du damier (colonnes, lignes)
+square_size = 25                            # Côté d'une case du damier (en mm), unité de la distance entre les caméras
+calibration_file = "Calibrage_stereo.npz"   # Fichier du calibrage
+
+# =========================================================================================== #
+#                                  1. Détection du damier                                     #
+# =========================================================================================== #
+
+def chessboard_points(chessboard_size, square_size):
+    """
+    Retourne les coordonnées réelles (en mm) des coins intérieurs du damier, dans le plan du damier (z = 0).
+    """
+    columns, rows = chessboard_size
+    points = np.zeros((columns*rows, 3), np.float32)
+    points[:,:2] = np.mgrid[0:columns, 0:rows].T.reshape(-1, 2)*square_size
+    return points
+
+def find_chessboard(frame, chessboard_size):
+    """
+    Recherche les coins intérieurs du damier sur une image et affine leur position au sous-pixel.
+
+    Retourne :
+    np.ndarray ou None
+        Coins détectés de forme (nombre de coins, 1, 2), ou None si le damier n'est pas entièrement visible.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    found, corners = cv2.findChessboardCorners(gray, chessboard_size, cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_NORMALIZE_IMAGE)
+    if not found:
+        return None
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+    return cv2.cornerSubPix(gray, corners, (11,11), (-1,-1), criteria)
+
+# =========================================================================================== #
+#                                2. Calcul du calibrage                                       #
+# =========================================================================================== #
+
+def stereo_calibration(corners_left, corners_right, image_size, chessboard_size=chessboard_size, square_size=square_size):
+    """
+    Calcule le calibrage des deux caméras à partir des coins du damier détectés sur chaque paire de captures.
+
+    Paramètres :
+    corners_left, corners_right : list de np.ndarray
+        Coins du damier détectés sur chaque capture (mêmes captures, dans le même ordre).
+    image_size : tuple (int, int)
+        Dimensions des images (largeur, hauteur).
+
+    Retourne :
+    dict
+        Matrices des caméras, coefficients de distorsion, translation T de la caméra droite par rapport à la
+        caméra gauche et erreurs de reprojection (en pixels).
+    """
+    object_points = [chessboard_points(chessboard_size, square_size)]*len(corners_left)
+
+    # Calibrage de chaque caméra seule, puis de leur position relative (paramètres intrinsèques fixés)
+    error_left, camera_matrix_left, distortion_left, _, _ = cv2.calibrateCamera(object_points, corners_left, image_size, None, None)
+    error_right, camera_matrix_right, distortion_right, _, _ = cv2.calibrateCamera(object_points, corners_right, image_size, None, None)
+
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 100, 1e-5)
+    error_stereo, camera_matrix_left, distortion_left, camera_matrix_right, distortion_right, _, T, _, _ = cv2.stereoCalibrate(
+        object_points, corners_left, corners_right, camera_matrix_left, distortion_left, camera_matrix_right, distortion_right,
+        image_size, criteria=criteria, flags=cv2.CALIB_FIX_INTRINSIC)
+
+    return {
+        "image_size": np.array(image_size),
+        "camera_matrix_left": camera_matrix_left, "distortion_left": distortion_left,
+        "camera_matrix_right": camera_matrix_right, "distortion_right": distortion_right,
+        "T": T,
+        "errors": np.array([error_left, error_right, error_stereo]),
+    }
+
+def save_calibration(calibration, path=calibration_file):
+    """Enregistre le calibrage dans un fichier .npz"""
+    np.savez(path, **calibration)
+    print(f"Calibrage enregistré dans \033[34m{path}\033[0m")
+
+def load_calibration(path=calibration_file):
+    """Retourne le calibrage enregistré, ou None si le fichier n'existe pas"""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+# =========================================================================================== #
+#                        3. Grandeurs utilisées par le programme principal                    #
+# =========================================================================================== #
+
+def vision_field_calibration(calibration, side):
+    """
+    Retourne le champ de vision horizontal (en rad) de la caméra 'side' (0 : gauche, 1 : droite), déduit de sa focale.
+    """
+    camera_matrix = calibration["camera_matrix_left"] if side == 0 else calibration["camera_matrix_right"]
+    width_frame = calibration["image_size"][0]
+    return float(2*np.atan(width_frame/(2*camera_matrix[0,0])))
+
+def baseline_calibration(calibration):
+    """
+    Retourne la distance entre les deux caméras (dans l'unité de 'square_size', en mm).
+    """
+    return float(np.linalg.norm(calibration["T"]))
+
+class StereoRectifier:
+    """
+    Classe corrigeant la distorsion des images ou des positions détectées de chaque caméra.
+
+    Les tables de correspondance de cv2.remap() sont calculées une seule fois, à la création. Les positions
+    corrigées sont exprimées dans une caméra idéale (sans distorsion) de même focale dont le centre optique est
+    au centre de l'image, ce qui correspond au modèle utilisé par Variables_positions.py.
+
+    Le calibrage n'est valable que pour la taille d'image du damier : check_frame() doit être appelée sur la
+    première image de chaque caméra pour adapter les matrices à une autre résolution ou refuser le calibrage.
+    """
+    def __init__(self, calibration):
+        image_size = tuple(int(value) for value in calibration["image_size"])
+        self.image_sizes = [image_size, image_size]  # Dimensions des images de chaque caméra (largeur, hauteur)
+        self.checked = [False, False]                # True une fois la taille des images de la caméra vérifiée
+
+        self.camera_matrices = [calibration["camera_matrix_left"].copy(), calibration["camera_matrix_right"].copy()]
+        self.distortions = (calibration["distortion_left"], calibration["distortion_right"])
+        self.ideal_matrices = [None, None]
+        self.maps = [None, None]
+        for side in (0, 1):
+            self.compute_maps(side)
+
+    def compute_maps(self, side):
+        """Calcule la caméra idéale et les tables de correction de la caméra 'side' pour la taille de ses images"""
+        width_frame, height_frame = self.image_sizes[side]
+
+        # Caméra idéale : même focale, centre optique au centre de l'image
+        ideal_matrix = self.camera_matrices[side].copy()
+        ideal_matrix[0,2] = width_frame/2
+        ideal_matrix[1,2] = height_frame/2
+        self.ideal_matrices[side] = ideal_matrix
+
+        # Tables de correction des images entières (format compact CV_16SC2, le plus rapide pour remap)
+        self.maps[side] = cv2.initUndistortRectifyMap(self.camera_matrices[side], self.distortions[side], None, ideal_matrix, self.image_sizes[side], cv2.CV_16SC2)
+
+    def check_frame(self, frame, side):
+        """
+        Vérifie que la taille des images de la caméra 'side' correspond à celle du calibrage.
+
+        Une image de même rapport largeur/hauteur (même capteur, autre résolution) est acceptée : la matrice
+        de la caméra est remise à l'échelle (la distorsion, exprimée en coordonnées normalisées, ne change pas).
+        Une image d'un autre rapport (capteur recadré) ne correspond plus au calibrage, qui est alors refusé.
+
+        Retourne :
+        bool
+            True si le calibrage est utilisable pour cette caméra.
+        """
+        height_frame, width_frame = frame.shape[:2]
+        width_calibration, height_calibration = self.image_sizes[side]
+        self.checked[side] = True
+        if (width_frame, height_frame) == (width_calibration, height_calibration):
+            return True
+
+        if abs(width_frame*height_calibration - height_frame*width_calibration) > 0.01*width_calibration*height_frame:
+            print(f"\n\033[31mImages de {width_frame}x{height_frame} pixels, calibrage fait en {width_calibration}x{height_calibration} pixels : "
+                  f"calibrage refusé, refaire le calibrage à cette résolution (Calibrage_stereo.py)\033[0m\n")
+            return False
+
+        self.camera_matrices[side][0] *= width_frame/width_calibration
+        self.camera_matrices[side][1] *= height_frame/height_calibration
+        self.image_sizes[side] = (width_frame, height_frame)
+        self.compute_maps(side)
+        print(f"\033[33mCalibrage fait en {width_calibration}x{height_calibration} pixels, remis à l'échelle des images de {width_frame}x{height_frame} pixels\033[0m")
+        return True
+
+    def undistort_frame(self, frame, side):
+        """Retourne l'image de la caméra 'side' (0 : gauche, 1 : droite) corrigée de la distorsion"""
+        map1, map2 = self.maps[side]
+        return cv2.remap(frame, map1, map2, cv2.INTER_LINEAR)
+
+    def undistort_point(self, point, side):
+        """
+        Retourne la position (x, y) corrigée de la distorsion (en pixels, valeurs non entières) d'un point
+        détecté sur la caméra 'side'. La position (0, 0) (joueur non détecté) est renvoyée sans modification.
+        """
+        if point[0] == 0 and point[1] == 0:
+            return point
+        points = np.array([[point]], dtype=np.float64)
+        corrected = cv2.undistortPoints(points, self.camera_matrices[side], self.distortions[side], P=self.ideal_matrices[side])
+        return float(corrected[0,0,0]), float(corrected[0,0,1])
+
+# =========================================================================================== #
+#                                4. Captures du damier                                        #
+# =========================================================================================== #
+
+if __name__ == "__main__":
+    # Ouverture des caméras (mêmes indices que le programme principal)
+    cap_left = cv2.VideoCapture(1)
+    cap_right = cv2.VideoCapture(0)
+
+    corners_left, corners_right = [], []
+    image_size = None
+
+    print("Appuyer sur 'c' pour capturer le damier, 'Échap' pour terminer et calculer le calibrage")
+
+    while True:
+        ret_left, frame_left = cap_left.read()
+        ret_right, frame_right = cap_right.read()
+
+        if not ret_left or not ret_right:
+            print("\n\033[31mProblème lors de la connexion aux caméras\033[0m\n")
+            break
+
+        found_left = find_chessboard(frame_left, chessboard_size)
+        found_right = find_chessboard(frame_right, chessboard_size)
+
+        # Affichage des coins détectés et du nombre de captures
+        display_left, display_right = frame_left.copy(), frame_right.copy()
+        if found_left is not None:
+            cv2.drawChessboardCorners(display_left, chessboard_size, found_left, True)
+        if found_right is not None:
+            cv2.drawChessboardCorners(display_right, chessboard_size, found_right, True)
+        combined = cv2.hconcat([display_left, display_right])
+        cv2.putText(combined, f"Captures : {len(corners_left)}", (20,50), 1, 3, (0,0,255), 3)
+        cv2.imshow("Calibrage stereo", combined)
+
+        key = cv2.waitKey(1)
+        if key == ord("c"):
+            if found_left is None or found_right is None:
+                print("\033[31mDamier non visible sur les deux caméras : capture ignorée\033[0m")
+            else:
+                corners_left.append(found_left)
+                corners_right.append(found_right)
+                image_size = (frame_left.shape[1], frame_left.shape[0])
+                print(f"Capture {len(corners_left)} enregistrée")
+        elif key == 27:
+            break
+
+    cap_left.release()
+    cap_right.release()
+    cv2.destroyAllWindows()
+
+    if len(corners_left) < 10:
+        print(f"\033[31mSeulement {len(corners_left)} captures : au moins 10 sont nécessaires pour un calibrage fiable\033[0m")
+    else:
+        calibration = stereo_calibration(corners_left, corners_right, image_size)
+        error_left, error_right, error_stereo = calibration["errors"]
+        print(f"Erreurs de reprojection : gauche {error_left:.3f} px, droite {error_right:.3f} px, stéréo {error_stereo:.3f} px")
+        print(f"Champs de vision : gauche {vision_field_calibration(calibration, 0):.4f} rad, droite {vision_field_calibration(calibration, 1):.4f} rad")
+        print(f"Distance entre les caméras : {baseline_calibration(calibration):.1f} mm")
+        save_calibration(calibration)
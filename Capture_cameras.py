@@ -0,0 +1,175 @@
+"""
+Nom du fichier : Capture_cameras.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Ce script gère l'acquisition des deux caméras en parallèle. Chaque caméra est lue par son propre thread
+    qui ne conserve que les dernières images datées (horloge monotone). La boucle principale récupère ensuite,
+    sans attendre, la paire d'images gauche/droite dont les instants de capture sont les plus proches.
+"""
+
+import threading
+import time
+from collections import deque
+
+class CameraStream:
+    """
+    Classe lisant en continu une caméra (cv2.VideoCapture) dans un thread dédié.
+
+    Seules les 'history' dernières images sont conservées avec leur instant de capture, ce qui permet à la
+    boucle principale de toujours travailler sur des images récentes sans être bloquée par la caméra la plus lente.
+    La méthode read() reprend l'interface de cv2.VideoCapture afin de pouvoir remplacer directement une capture.
+    """
+    def __init__(self, capture, camera_name, history=4):
+        self.capture = capture          # Objet cv2.VideoCapture à lire
+        self.camera_name = camera_name  # Nom de la caméra (affichage des erreurs)
+        self.running = True             # Indicateur pour gérer l'arrêt propre du thread
+        self.ended = False              # Passe à True lorsque la caméra ne renvoie plus d'image
+        self.frame_index = 0            # Nombre d'images lues depuis le lancement
+
+        self.buffer = deque(maxlen=history)  # Dernières images sous la forme (instant, indice, image)
+        self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
+
+        # Lancement d'un thread en mode daemon pour lire la caméra en continu
+        self.thread_capture = threading.Thread(target=self.read_continuously, daemon=True)
+        self.thread_capture.start()
+
+    def read_continuously(self):
+        """Lit la caméra en boucle et remplace les images les plus anciennes du tampon"""
+        while self.running:
+            ret, frame = self.capture.read()
+            timestamp = time.monotonic()  # Instant de réception de l'image
+
+            with self.new_frame:
+                if not ret:
+                    self.ended = True
+                    self.new_frame.notify_all()
+                    break
+                self.frame_index += 1
+                self.buffer.append((timestamp, self.frame_index, frame))
+                self.new_frame.notify_all()
+
+    def wait_first_frame(self, timeout=5):
+        """
+        Attend la première image de la caméra (uniquement au démarrage).
+
+        Retourne True si une image est disponible, False si la caméra n'a rien renvoyé avant 'timeout' secondes.
+        """
+        with self.new_frame:
+            self.new_frame.wait_for(lambda: len(self.buffer) > 0 or self.ended, timeout)
+            return len(self.buffer) > 0
+
+    def wait_frame_after(self, frame_index, timeout):
+        """Attend au plus 'timeout' secondes une image d'indice supérieur à 'frame_index'"""
+        with self.new_frame:
+            return self.new_frame.wait_for(lambda: self.frame_index > frame_index or self.ended, timeout)
+
+    def latest(self):
+        """Retourne la dernière image reçue sous la forme (instant, indice, image), ou None si aucune image"""
+        with self.lock:
+            if not self.buffer:
+                return None
+            return self.buffer[-1]
+
+    def history(self):
+        """Retourne une copie de la liste des images conservées, de la plus ancienne à la plus récente"""
+        with self.lock:
+            return list(self.buffer)
+
+    def read(self):
+        """
+        Retourne la dernière image disponible, avec la même interface que cv2.VideoCapture.read().
+        """
+        if not self.wait_first_frame() or self.ended:
+            return False, None
+        return True, self.latest()[2]
+
+    def isOpened(self):
+        return self.capture.isOpened() and not self.ended
+
+    def get(self, propId):
+        return self.capture.get(propId)
+
+    def release(self, timeout=5):
+        """
+        Arrête le thread de lecture puis libère la caméra.
+
+        La caméra n'est libérée qu'une fois le thread arrêté : un thread encore bloqué dans read() ne doit pas
+        lire une capture en cours de libération.
+        """
+        self.running = False
+        self.thread_capture.join(timeout)
+        if self.thread_capture.is_alive():
+            print(f"\033[31mLecture de la caméra {self.camera_name} toujours bloquée : caméra non libérée\033[0m")
+            return
+        self.capture.release()
+
+class StereoCapture:
+    """
+    Classe associant les images des caméras gauche et droite selon leur instant de capture.
+
+    La caméra dont la dernière image est la plus ancienne sert de référence : on lui associe l'image de l'autre
+    caméra la plus proche dans le temps parmi celles conservées. Aucun appel n'attend une nouvelle image, sauf
+    au démarrage.
+    """
+    def __init__(self, stream_left, stream_right):
+        self.stream_left = stream_left
+        self.stream_right = stream_right
+        self.last_pair = (0, 0)  # Indices de la dernière paire renvoyée
+        self.last_seen = (0, 0)  # Indices des dernières images reçues lors de la lecture précédente
+        self.last_timestamps = (0, 0)  # Instants de capture de la dernière paire renvoyée
+
+    def read(self, timeout=0):
+        """
+        Retourne la paire d'images la mieux synchronisée disponible.
+
+        Si 'timeout' est strictement positif et qu'aucune nouvelle image n'est arrivée depuis la paire précédente,
+        on attend au plus 'timeout' secondes une nouvelle image sur l'une des deux caméras.
+
+        Retourne :
+        tuple (bool, np.ndarray, np.ndarray, float, bool)
+            - True si les deux caméras fonctionnent.
+            - Image de la caméra gauche.
+            - Image de la caméra droite.
+            - Décalage temporel entre les deux images (en s).
+            - True si la paire contient au moins une image qui n'avait pas encore été renvoyée.
+        """
+        if not self.stream_left.wait_first_frame() or not self.stream_right.wait_first_frame():
+            return False, None, None, 0, False
+        if self.stream_left.ended or self.stream_right.ended:
+            return False, None, None, 0, False
+
+        if timeout > 0 and self.stream_left.frame_index <= self.last_seen[0] and self.stream_right.frame_index <= self.last_seen[1]:
+            # Attente partagée entre les deux caméras : la première qui fournit une image débloque la lecture
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if self.stream_left.wait_frame_after(self.last_seen[0], min(0.002, timeout)):
+                    break
+                if self.stream_right.frame_index > self.last_seen[1] or self.stream_right.ended:
+                    break
+
+        history_left = self.stream_left.history()
+        history_right = self.stream_right.history()
+        self.last_seen = (history_left[-1][1], history_right[-1][1])
+
+        # La caméra la plus en retard sert de référence
+        if history_left[-1][0] <= history_right[-1][0]:
+            reference = history_left[-1]
+            other = min(history_right, key=lambda item: abs(item[0] - reference[0]))
+            left, right = reference, other
+        else:
+            reference = history_right[-1]
+            other = min(history_left, key=lambda item: abs(item[0] - reference[0]))
+            left, right = other, reference
+
+        pair = (left[1], right[1])
+        is_new = pair != self.last_pair
+        self.last_pair = pair
+        self.last_timestamps = (left[0], right[0])
+
+        return True, left[2], right[2], abs(left[0] - right[0]), is_new
+
+    def release(self):
+        self.stream_left.release()
+        self.stream_right.release()
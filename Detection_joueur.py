@@ -9,6 +9,7 @@ Description :
 
 import cv2
 import numpy as np
+from collections import OrderedDict
 
 def red_filter(frame,low_color,high_color):
     """
@@ -47,88 +48,449 @@ def threshold_filter(frame):
     threshold = cv2.threshold(frame_gris,50,255,cv2.THRESH_BINARY)[1]  # Seuillage
     return threshold
 
-def draw_figure_color(frame_ref,frame_mod):
+#--------- Segmentation par table de correspondance BGR -> masque ---------
+
+lookup_tables = OrderedDict()  # Tables récemment utilisées, partagées entre les caméras (clé : bornes HSV et précision)
+lookup_tables_capacity = 4     # Nombre maximal de tables conservées (les bornes adaptatives en créent une à chaque changement)
+
+class ColorLookupTable:
+    """
+    Classe regroupant le filtre de couleur HSV et le seuillage dans une table de correspondance BGR -> masque.
+
+    La table est calculée une seule fois pour des bornes HSV données : chaque canal BGR
+    est quantifié sur 'bits' bits et chaque case de la table contient le résultat de red_filter() suivi de
+    threshold_filter() pour la couleur centrale de la case. Le masque d'une image s'obtient ensuite par une
+    seule lecture de la table par pixel.
+    """
+    def __init__(self, low_color, high_color, bits=5):
+        if not 1 <= bits <= 5:
+            raise ValueError("La précision de la table doit être comprise entre 1 et 5 bits par canal")
+
+        self.low_color = tuple(int(c) for c in low_color)
+        self.high_color = tuple(int(c) for c in high_color)
+        self.bits = bits
+
+        levels = 1 << bits     # Nombre de niveaux par canal
+        shift = 8 - bits       # Nombre de bits de poids faible ignorés
+        half_step = (1 << shift) >> 1
+
+        # Couleur centrale de chaque case, rangée comme une image pour utiliser les fonctions OpenCV
+        values = (np.arange(levels) << shift) + half_step
+        b, g, r = np.meshgrid(values, values, values, indexing="ij")
+        grid = np.stack([b, g, r], axis=-1).astype(np.uint8).reshape(levels*levels, levels, 3)
+
+        # Même chaîne de traitement que red_filter() puis threshold_filter()
+        self.table = threshold_filter(red_filter(grid, np.array(self.low_color), np.array(self.high_color))).reshape(-1)
+
+        # Contribution de chaque canal à l'indice de la table : indice = (b << 2*bits) | (g << bits) | r
+        quantized = np.arange(256) >> shift
+        self.channel_index = np.stack([quantized << (2*bits), quantized << bits, quantized], axis=-1).astype(np.uint16).reshape(256, 1, 3)
+
+    def mask(self, frame):
+        """
+        Calcule l'image seuillée (0 ou 255) d'une image BGR par lecture de la table.
+        """
+        index_channels = cv2.LUT(frame, self.channel_index)                        # Indice partiel de chaque canal (16 bits)
+        index = cv2.transform(index_channels, np.ones((1, 3), dtype=np.float32))  # Somme des trois canaux
+        return np.take(self.table, index)
+
+def color_lookup_table(low_color, high_color, bits=5):
+    """
+    Retourne la table de correspondance associée aux bornes HSV, en la calculant uniquement si elle ne fait
+    pas partie des 'lookup_tables_capacity' dernières tables utilisées (les plus anciennes sont abandonnées).
+    """
+    key = (tuple(int(c) for c in low_color), tuple(int(c) for c in high_color), bits)
+    if key in lookup_tables:
+        lookup_tables.move_to_end(key)
+        return lookup_tables[key]
+
+    lookup_tables[key] = ColorLookupTable(low_color, high_color, bits)
+    if len(lookup_tables) > lookup_tables_capacity:
+        lookup_tables.popitem(last=False)
+    return lookup_tables[key]
+
+def segmentation(frame,low_color,high_color,lookup_table=None):
+    """
+    Calcule l'image filtrée et l'image seuillée d'une image BGR.
+
+    Si une table de correspondance est fournie, seule l'image seuillée est calculée (l'image filtrée vaut
+    None et peut être reconstruite à partir du masque si elle doit être affichée).
     """
-    Identifie le plus grand objet détecté (probablement le joueur) et dessine un rectangle et un point central autour de chaque objet de la couleur filtrée choisie détecté.
+    if lookup_table is not None:
+        return None, lookup_table.mask(frame)
+
+    color = red_filter(frame,low_color,high_color)  # Filtrage de la couleur rouge
+    threshold = threshold_filter(color)  # Application du seuillage
+    return color, threshold
+
+# Description de chaque objet détecté : rectangle englobant, nombre de pixels et barycentre
+blob_dtype = np.dtype([("x",np.int32),("y",np.int32),("w",np.int32),("h",np.int32),("area",np.int32),("cx",np.float64),("cy",np.float64)])
+
+def blob_statistics(frame_ref):
+    """
+    Calcule en une seule passe (composantes connexes) les caractéristiques de tous les objets détectés.
 
     Paramètres :
     frame_ref : np.ndarray
         Image de référence contenant les objets détectés (image seuillée).
-    frame_mod : np.ndarray
-        Image d'origine sur laquelle les figures seront dessinées.
 
     Retourne :
-    tuple (np.ndarray, tuple (int, int))
-        - Image avec les rectangles et points dessinés.
-        - Coordonnées du centre de l'objet détecté.
+    np.ndarray (blob_dtype)
+        Tableau structuré avec, pour chaque objet, son rectangle englobant (x, y, w, h), son aire en pixels
+        (area) et son barycentre (cx, cy). Le fond de l'image n'est pas inclus.
     """
-    contours = cv2.findContours(frame_ref,cv2.RETR_EXTERNAL,cv2.CHAIN_APPROX_SIMPLE)[0]  # Détection des contours
-    frame_final = np.copy(frame_mod)
+    count, _, stats, centroids = cv2.connectedComponentsWithStats(frame_ref, connectivity=8)
 
-    aire_max = 0  # Initialisation de la plus grande aire détectée
-    rect_max = (0,0,0,0)  # Initialisation du plus grand rectangle détecté
+    # L'étiquette 0 correspond au fond de l'image
+    blobs = np.empty(count-1, dtype=blob_dtype)
+    blobs["x"] = stats[1:,cv2.CC_STAT_LEFT]
+    blobs["y"] = stats[1:,cv2.CC_STAT_TOP]
+    blobs["w"] = stats[1:,cv2.CC_STAT_WIDTH]
+    blobs["h"] = stats[1:,cv2.CC_STAT_HEIGHT]
+    blobs["area"] = stats[1:,cv2.CC_STAT_AREA]
+    blobs["cx"] = centroids[1:,0]
+    blobs["cy"] = centroids[1:,1]
 
-    for cnt in contours :
-        x,y,w,h = cv2.boundingRect(cnt)  # Définition du rectangle englobant
-        if w*h > aire_max :  # Vérification si la zone est la plus grande trouvée
-            aire_max = w*h
-            rect_max=(x,y,w,h)
+    return blobs
 
-        cx = int((x + x + w) / 2)  # Calcul du centre en x
-        cy = int((y + y + h) / 2)  # Calcul du centre en y
+def select_player(blobs):
+    """
+    Retourne l'indice de l'objet au plus grand rectangle englobant (probablement le joueur), ou -1 si aucun objet.
+    """
+    if len(blobs) == 0:
+        return -1
+    return int(np.argmax(blobs["w"].astype(np.int64)*blobs["h"]))
 
-        # Dessin du rectangle et du point central
-        cv2.rectangle(frame_final, (x,y), (x+w,y+h), (0, 255, 0), 2)
-        cv2.circle(frame_final, (cx,cy), 5, (0, 255, 0), -1)
+def blob_rectangle(blobs, index):
+    """
+    Retourne le rectangle (x, y, w, h) de l'objet d'indice 'index', ou None si l'indice vaut -1.
+    """
+    if index < 0:
+        return None
+    blob = blobs[index]
+    return int(blob["x"]), int(blob["y"]), int(blob["w"]), int(blob["h"])
+
+def blob_rectangles(blobs):
+    """
+    Convertit le tableau des objets en liste de rectangles (x, y, w, h), pour le dessin.
+    """
+    return list(zip(blobs["x"].tolist(), blobs["y"].tolist(), blobs["w"].tolist(), blobs["h"].tolist()))
+
+def rectangle_center(rect):
+    """
+    Calcule le centre (cx, cy) d'un rectangle (x, y, w, h). Un rectangle absent donne la position (0, 0).
+    """
+    x,y,w,h = rect if rect is not None else (0,0,0,0)
+
+    cx = int((x + x + w) / 2)  # Calcul du centre en x
+    cy = int((y + y + h) / 2)  # Calcul du centre en y
+
+    return cx, cy
+
+class RegionOfInterest:
+    """
+    Classe mémorisant la fenêtre de recherche du joueur d'une caméra (mode suivi par région d'intérêt).
+
+    La recherche se fait dans une fenêtre centrée sur la dernière position détectée. La fenêtre est agrandie
+    lorsque le joueur touche son bord ou n'est plus détecté, jusqu'à couvrir l'image entière.
+    """
+    def __init__(self, half_size=(160,160), growth=2, margin=1.5):
+        self.base_half_size = half_size  # Demi-taille minimale de la fenêtre (largeur, hauteur) en pixels
+        self.growth = growth             # Facteur d'agrandissement de la fenêtre
+        self.margin = margin             # Marge autour du joueur détecté (en proportion de sa taille)
+        self.reset()
+
+    def reset(self):
+        """Oublie la dernière position : la prochaine recherche se fait sur l'image entière"""
+        self.center = None
+        self.half_size = self.base_half_size
+
+    def window(self, shape):
+        """Retourne la fenêtre de recherche (x0, y0, x1, y1) limitée aux dimensions de l'image"""
+        height, width = shape[:2]
+        if self.center is None:
+            return 0, 0, width, height
 
-    x_max,y_max,w_max,h_max = rect_max  # Récupération des coordonnées du plus grand rectangle
+        cx, cy = self.center
+        hw, hh = self.half_size
+        return max(cx-hw,0), max(cy-hh,0), min(cx+hw,width), min(cy+hh,height)
 
-    cx_max = int((x_max + x_max + w_max) / 2)  # Calcul du centre en x
-    cy_max = int((y_max + y_max + h_max) / 2)  # Calcul du centre en y
-        
-    return frame_final, (cx_max,cy_max)
+    def grow(self, shape):
+        """Agrandit la fenêtre. Retourne False si elle couvrait déjà toute l'image"""
+        if self.window(shape) == (0, 0, shape[1], shape[0]):
+            return False
+        self.half_size = (int(self.half_size[0]*self.growth), int(self.half_size[1]*self.growth))
+        return True
 
-def draw_figure_player(frame_ref,frame_mod):
+    def update(self, rect):
+        """Centre la fenêtre sur le rectangle (x, y, w, h) du joueur, ou réinitialise si le joueur est perdu"""
+        if rect is None:
+            self.reset()
+            return
+
+        x,y,w,h = rect
+        self.center = (int(x + w/2), int(y + h/2))
+        self.half_size = (max(self.base_half_size[0], int(self.margin*w)), max(self.base_half_size[1], int(self.margin*h)))
+
+#--------- Détection multi-résolution ---------
+
+def search_window(frame_window,low_color,high_color,lookup_table=None,pyramid_factor=1):
+    """
+    Recherche les objets de la couleur filtrée dans une image (ou une fenêtre d'image).
+
+    Si 'pyramid_factor' vaut 2 ou 4, la segmentation est faite sur l'image réduite d'autant, puis le rectangle
+    du joueur est recalculé à pleine résolution dans une petite zone autour de sa position grossière. La
+    position du joueur garde ainsi la précision de l'image d'origine.
+
+    Retourne :
+    tuple (np.ndarray, np.ndarray, np.ndarray, int)
+        - Image filtrée pour la couleur rouge (réduite si pyramid_factor > 1, None avec une table de correspondance).
+        - Image seuillée (réduite si pyramid_factor > 1).
+        - Objets détectés (blob_dtype, coordonnées pleine résolution de la fenêtre).
+        - Indice du joueur parmi les objets, ou -1 si le joueur n'est pas détecté.
     """
-    Identifie le plus grand objet détecté (probablement le joueur) et dessine un rectangle autour.
+    if pyramid_factor <= 1:
+        color, threshold = segmentation(frame_window,low_color,high_color,lookup_table)
+        blobs = blob_statistics(threshold)
+        return color, threshold, blobs, select_player(blobs)
+
+    height, width = frame_window.shape[:2]
+
+    # Recherche grossière sur l'image réduite (plus proche voisin pour ne pas mélanger les couleurs)
+    small_size = (max(width//pyramid_factor,1), max(height//pyramid_factor,1))
+    small = cv2.resize(frame_window,small_size,interpolation=cv2.INTER_NEAREST)
+    color, threshold = segmentation(small,low_color,high_color,lookup_table)
+    blobs = blob_statistics(threshold)
+    index = select_player(blobs)
+
+    # Passage des objets à la résolution d'origine
+    scale_x = width/small_size[0]
+    scale_y = height/small_size[1]
+    blobs["x"] = np.floor(blobs["x"]*scale_x)
+    blobs["y"] = np.floor(blobs["y"]*scale_y)
+    blobs["w"] = np.ceil(blobs["w"]*scale_x)
+    blobs["h"] = np.ceil(blobs["h"]*scale_y)
+    blobs["area"] = np.round(blobs["area"]*scale_x*scale_y)
+    blobs["cx"] = (blobs["cx"]+0.5)*scale_x-0.5
+    blobs["cy"] = (blobs["cy"]+0.5)*scale_y-0.5
+
+    if index >= 0:
+        # Affinage à pleine résolution dans une zone autour du joueur (marge d'un pas de la pyramide)
+        x,y,w,h = blob_rectangle(blobs, index)
+        margin = 2*pyramid_factor
+        px0, py0 = max(x-margin,0), max(y-margin,0)
+        px1, py1 = min(x+w+margin,width), min(y+h+margin,height)
+
+        patch_blobs = blob_statistics(segmentation(frame_window[py0:py1,px0:px1],low_color,high_color,lookup_table)[1])
+        patch_index = select_player(patch_blobs)
+
+        if patch_index >= 0:
+            refined = patch_blobs[patch_index]
+            refined["x"] += px0
+            refined["y"] += py0
+            refined["cx"] += px0
+            refined["cy"] += py0
+            blobs[index] = refined
+
+    return color, threshold, blobs, index
+
+def search_region_of_interest(frame,low_color,high_color,roi,lookup_table=None,pyramid_factor=1):
+    """
+    Recherche le joueur dans la fenêtre de la région d'intérêt, en l'agrandissant si nécessaire.
+
+    Retourne :
+    tuple (np.ndarray, np.ndarray, tuple (int, int, int, int), np.ndarray, int)
+        - Image filtrée pour la couleur rouge, limitée à la fenêtre (voir search_window()).
+        - Image seuillée, limitée à la fenêtre (voir search_window()).
+        - Fenêtre de recherche finale (x0, y0, x1, y1).
+        - Objets détectés dans la fenêtre (blob_dtype, coordonnées de l'image entière).
+        - Indice du joueur parmi les objets, ou -1 si le joueur n'est pas détecté.
+    """
+    height, width = frame.shape[:2]
+
+    while True:
+        x0, y0, x1, y1 = roi.window(frame.shape)
+        color_window, threshold_window, blobs, index = search_window(frame[y0:y1,x0:x1],low_color,high_color,lookup_table,pyramid_factor)  # Filtrage limité à la fenêtre
+        rect = blob_rectangle(blobs, index)
+
+        if rect is not None:
+            x,y,w,h = rect
+            # Le joueur touche-t-il un bord de la fenêtre qui n'est pas un bord de l'image ?
+            touch_edge = (x == 0 and x0 > 0) or (y == 0 and y0 > 0) or (x+w == x1-x0 and x1 < width) or (y+h == y1-y0 and y1 < height)
+            if not touch_edge:
+                break
+
+        # Joueur perdu ou coupé par la fenêtre : on élargit la recherche jusqu'à l'image entière
+        if not roi.grow(frame.shape):
+            break
+
+    # Passage des objets dans le repère de l'image entière
+    blobs["x"] += x0
+    blobs["y"] += y0
+    blobs["cx"] += x0
+    blobs["cy"] += y0
+    roi.update(blob_rectangle(blobs, index))
+
+    return color_window, threshold_window, (x0, y0, x1, y1), blobs, index
+
+#--------- Détection unique et rendu à la demande des vues ---------
+
+class PlayerDetection:
+    """
+    Résultat compact de la détection du joueur sur une image.
+
+    Seules les données issues de l'unique passe de détection sont conservées (fenêtre filtrée, objets détectés
+    et position). Les images d'affichage (seuillage, couleur filtrée) ne sont reconstruites qu'à la demande.
+    """
+    def __init__(self, frame, window, color, threshold, blobs, player_index):
+        self.frame = frame                        # Image d'origine au format BGR
+        self.window = window                      # Fenêtre de recherche (x0, y0, x1, y1)
+        self.color = color                        # Image filtrée pour la couleur rouge, limitée à la fenêtre (calculée à la demande si None, éventuellement réduite)
+        self.threshold = threshold                # Image seuillée, limitée à la fenêtre (éventuellement réduite)
+        self.blobs = blobs                        # Objets détectés (tableau structuré blob_dtype)
+        self.player_index = player_index          # Indice du joueur parmi les objets, -1 s'il n'est pas détecté
+        self.player_rectangle = blob_rectangle(blobs, player_index)  # Rectangle du joueur, ou None
+        self.position = rectangle_center(self.player_rectangle)  # Position du joueur, (0, 0) s'il n'est pas détecté
+
+    def window_image(self, image_window):
+        """Ramène une image calculée sur une image réduite à la taille de la fenêtre de recherche"""
+        x0, y0, x1, y1 = self.window
+        if image_window.shape[:2] != (y1-y0, x1-x0):
+            image_window = cv2.resize(image_window,(x1-x0,y1-y0),interpolation=cv2.INTER_NEAREST)
+        return image_window
+
+    def full_image(self, image_window):
+        """Replace une image limitée à la fenêtre de recherche dans une image de la taille de l'image d'origine"""
+        image_window = self.window_image(image_window)
+        x0, y0, x1, y1 = self.window
+        if (x0, y0, x1, y1) == (0, 0, self.frame.shape[1], self.frame.shape[0]):
+            return image_window
+
+        image = np.zeros(self.frame.shape[:2] + image_window.shape[2:], dtype=np.uint8)
+        image[y0:y1,x0:x1] = image_window
+        return image
+
+    def threshold_image(self):
+        """Retourne l'image seuillée en niveaux de gris de la taille de l'image d'origine"""
+        return self.full_image(self.threshold)
+
+    def color_image(self):
+        """Retourne l'image filtrée pour la couleur rouge de la taille de l'image d'origine"""
+        if self.color is None:
+            x0, y0, x1, y1 = self.window
+            frame_window = self.frame[y0:y1,x0:x1]
+            self.color = cv2.bitwise_and(frame_window, frame_window, mask=self.window_image(self.threshold))
+        return self.full_image(self.color)
+
+def detect_player(frame,low_color,high_color,roi=None,lookup_table=None,pyramid_factor=1):
+    """
+    Détecte le joueur en une seule passe (filtrage, seuillage puis une unique analyse des composantes connexes).
 
     Paramètres :
-    frame_ref : np.ndarray
-        Image de référence contenant les objets détectés (image seuillée).
-    frame_mod : np.ndarray
-        Image d'origine sur laquelle les figures seront dessinées.
+    frame : np.ndarray
+        Image d'entrée au format BGR.
+    low_color : tuple (int, int, int)
+        Valeurs HSV minimales pour la détection de la couleur rouge.
+    high_color : tuple (int, int, int)
+        Valeurs HSV maximales pour la détection de la couleur rouge.
+    roi : RegionOfInterest ou None
+        Région d'intérêt de la caméra. Si elle est fournie, le filtrage est limité à une fenêtre autour de la
+        dernière position du joueur.
+    lookup_table : ColorLookupTable ou None
+        Table de correspondance des bornes HSV. Si elle est fournie, le masque est obtenu par lecture de la
+        table au lieu de la conversion HSV.
+    pyramid_factor : int
+        Facteur de réduction de l'image pour la recherche grossière (1, 2 ou 4). Le centre du joueur est
+        ensuite affiné à pleine résolution.
 
     Retourne :
-    tuple (np.ndarray, tuple (int, int))
-        - Image avec le rectangle et le point central du joueur.
-        - Coordonnées du centre du joueur détecté.
+    PlayerDetection
+        Résultat de la détection, à partir duquel les vues d'affichage sont générées avec render_view().
     """
-    contours = cv2.findContours(frame_ref,cv2.RETR_EXTERNAL,cv2.CHAIN_APPROX_SIMPLE)[0]  # Détection des contours
-    frame_final = np.copy(frame_mod)
-    
-    aire_max = 0  # Initialisation de la plus grande aire détectée
-    rect_max = (0,0,0,0)  # Initialisation du plus grand rectangle détecté
+    if roi is None:
+        color, threshold, blobs, player_index = search_window(frame,low_color,high_color,lookup_table,pyramid_factor)  # Filtrage, seuillage et recherche des objets
+        window = (0, 0, frame.shape[1], frame.shape[0])
+    else:
+        color, threshold, window, blobs, player_index = search_region_of_interest(frame,low_color,high_color,roi,lookup_table,pyramid_factor)
 
-    for cnt in contours :
-        x,y,w,h = cv2.boundingRect(cnt)  # Définition du rectangle englobant
-        if w*h > aire_max :  # Vérification si la zone est la plus grande trouvée
-            aire_max = w*h
-            rect_max=(x,y,w,h)
+    return PlayerDetection(frame, window, color, threshold, blobs, player_index)
 
-    x,y,w,h = rect_max  # Récupération des coordonnées du plus grand rectangle
+def draw_rectangles(img,rectangles):
+    """
+    Dessine un rectangle et un point central pour chaque rectangle (x, y, w, h) de la liste.
+    """
+    for (x,y,w,h) in rectangles:
+        cx, cy = rectangle_center((x,y,w,h))
 
-    cx = int((x + x + w) / 2)  # Calcul du centre en x
-    cy = int((y + y + h) / 2)  # Calcul du centre en y
+        # Dessin du rectangle et du point central
+        cv2.rectangle(img, (x,y), (x+w,y+h), (0, 255, 0), 2)
+        cv2.circle(img, (cx,cy), 5, (0, 255, 0), -1)
 
-    # Dessin du rectangle et du point central
-    cv2.rectangle(frame_final, (x,y), (x+w,y+h), (0, 255, 0), 2)
-    cv2.circle(frame_final, (cx,cy), 5, (0, 255, 0), -1)
+def scale_rectangles(rectangles,fx,fy):
+    """
+    Ramène des rectangles (x, y, w, h) de l'image d'origine à une image redimensionnée d'un facteur (fx, fy).
+    """
+    return [(int(x*fx),int(y*fy),int(w*fx),int(h*fy)) for (x,y,w,h) in rectangles]
 
-    return frame_final, (cx,cy)
+def render_view(detection,selected_frame,only_player_detection,out=None):
+    """
+    Génère uniquement la vue demandée à partir d'un résultat de détection.
 
-def final_frame(frame,low_color,high_color,only_player_detection):
+    Paramètres :
+    detection : PlayerDetection
+        Résultat de detect_player().
+    selected_frame : str
+        Vue à générer : "Sans modification", "Seuillage" ou "Couleur filtrée".
+    only_player_detection : bool
+        Indique si on ne dessine que le joueur (True) ou tous les objets rouges (False).
+    out : np.ndarray ou None
+        Image BGR (par exemple une partie de l'image composite affichée) dans laquelle la vue est écrite, redimensionnée
+        si sa taille diffère de celle de l'image d'origine. Si None, une nouvelle image est créée.
+
+    Retourne :
+    np.ndarray
+        Image BGR de la vue avec les figures dessinées ('out' s'il est fourni).
     """
-    Traite une image pour détecter le joueur et les objets rouges.
+    if selected_frame == "Seuillage":
+        source = detection.threshold_image()
+    elif selected_frame == "Couleur filtrée":
+        source = detection.color_image()
+    else:
+        source = detection.frame
+
+    if only_player_detection:
+        rectangles = [detection.player_rectangle if detection.player_rectangle is not None else (0,0,0,0)]
+    else:
+        rectangles = blob_rectangles(detection.blobs)
+
+    # Écriture de la vue dans une nouvelle image ou directement dans 'out' (sans image intermédiaire si la taille est la même)
+    if out is None:
+        view = cv2.cvtColor(source,cv2.COLOR_GRAY2BGR) if source.ndim == 2 else np.copy(source)
+    else:
+        view = out
+        size = (out.shape[1], out.shape[0])
+        if source.shape[:2] == out.shape[:2]:
+            if source.ndim == 2:
+                cv2.cvtColor(source,cv2.COLOR_GRAY2BGR,dst=out)
+            else:
+                np.copyto(out,source)
+        else:
+            if source.ndim == 2:
+                cv2.cvtColor(cv2.resize(source,size,interpolation=cv2.INTER_NEAREST),cv2.COLOR_GRAY2BGR,dst=out)
+            else:
+                cv2.resize(source,size,dst=out,interpolation=cv2.INTER_LINEAR)
+            rectangles = scale_rectangles(rectangles,size[0]/source.shape[1],size[1]/source.shape[0])
+
+    draw_rectangles(view,rectangles)
+
+    return view
+
+def final_frame(frame,low_color,high_color,only_player_detection,roi=None,lookup_table=None,pyramid_factor=1):
+    """
+    Traite une image pour détecter le joueur et les objets rouges, et génère toutes les vues d'affichage.
+
+    La détection n'est faite qu'une fois (voir detect_player()). Pour n'obtenir que la vue affichée, utiliser
+    directement detect_player() puis render_view().
 
     Paramètres :
     frame : np.ndarray
@@ -139,6 +501,13 @@ def final_frame(frame,low_color,high_color,only_player_detection):
         Valeurs HSV maximales pour la détection de la couleur rouge.
     only_player_detection : bool
         Indique si on ne doit détecter que le joueur (True) ou tous les objets rouges (False).
+    roi : RegionOfInterest ou None
+        Région d'intérêt de la caméra. Si elle est fournie, le filtrage est limité à une fenêtre autour de la
+        dernière position du joueur (les images renvoyées sont nulles hors de cette fenêtre).
+    lookup_table : ColorLookupTable ou None
+        Table de correspondance des bornes HSV (voir color_lookup_table()).
+    pyramid_factor : int
+        Facteur de réduction de l'image pour la recherche grossière (1, 2 ou 4).
 
     Retourne :
     tuple (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, tuple (int, int))
@@ -149,21 +518,10 @@ def final_frame(frame,low_color,high_color,only_player_detection):
         - Image filtrée avec les figures dessinées.
         - Position du joueur ou de l'objet détecté.
     """
-    color = red_filter(frame,low_color,high_color)  # Filtrage de la couleur rouge
-    threshold = threshold_filter(color)  # Application du seuillage
+    detection = detect_player(frame,low_color,high_color,roi,lookup_table,pyramid_factor)
 
-    # On ajoute un canal de couleur aux images de seuillage
-    threshold_bgr = cv2.cvtColor(threshold,cv2.COLOR_GRAY2BGR)
-
-    if only_player_detection:
-        # Détection du joueur uniquement
-        frame_figure, position = draw_figure_player(threshold,frame)
-        threshold_figure = draw_figure_player(threshold,threshold_bgr)[0]
-        color_figure = draw_figure_player(threshold,color)[0]
-    else:
-        # Détection de tous les objets rouges
-        frame_figure, position = draw_figure_color(threshold,frame)
-        threshold_figure = draw_figure_color(threshold,threshold_bgr)[0]
-        color_figure = draw_figure_color(threshold,color)[0]
+    frame_figure = render_view(detection,"Sans modification",only_player_detection)
+    threshold_figure = render_view(detection,"Seuillage",only_player_detection)
+    color_figure = render_view(detection,"Couleur filtrée",only_player_detection)
 
-    return frame_figure, threshold, threshold_figure, color, color_figure, position
\ No newline at end of file
+    return frame_figure, detection.threshold_image(), threshold_figure, detection.color_image(), color_figure, detection.position
@@ -9,8 +9,12 @@ Description :
     Il utilise OpenCV pour capturer des images, ajuster les seuils HSV en temps réel et vérifier la précision de la détection.
 """
 
+import os
 import cv2
+import itertools
 import numpy as np
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
 from Detection_joueur import final_frame
 
 # Fonction vide utilisée pour les trackbars
@@ -166,6 +170,296 @@ def automatic_filter_determination():
 
     return posible_hsv  # Retourner les plages HSV possibles
 
+#--------- Recherche automatique sur un ensemble d'images capturées une seule fois ---------
+
+def capture_frames(capture, count):
+    """
+    Capture 'count' images consécutives d'une caméra (une seule fois pour toute la recherche).
+    """
+    frames = []
+    for i in range(count):
+        ret, frame = capture.read()
+        if not ret:
+            break
+        frames.append(frame)
+    return frames
+
+def hsv_stack(frames, low_color, high_color):
+    """
+    Prépare les images pour l'évaluation rapide de nombreuses bornes HSV.
+
+    Les images sont converties une seule fois en HSV, puis recadrées sur le rectangle englobant les pixels
+    retenus par les bornes les plus larges testées ('low_color', 'high_color') : les pixels en dehors ne peuvent
+    appartenir au masque d'aucune borne testée, les objets détectés sont donc identiques. Les conditions
+    communes à toutes les bornes (borne haute et seuillage de threshold_filter()) sont calculées une fois.
+
+    Une ligne vide est ajoutée sous chaque image : les images empilées forment ainsi une seule grande image
+    sans qu'un objet puisse s'étendre d'une image à la suivante.
+
+    Retourne :
+    tuple (np.ndarray, np.ndarray, tuple (int, int))
+        - Images HSV recadrées de forme (nombre d'images, hauteur + 1, largeur, 3).
+        - Masques (0 ou 255) des pixels valides pour toutes les bornes, de forme (nombre d'images, hauteur + 1, largeur).
+        - Position (x, y) du recadrage dans l'image entière.
+        Si aucun pixel n'est retenu par les bornes les plus larges, le recadrage est vide (largeur nulle) : aucune
+        borne ne peut alors détecter le joueur.
+    """
+    high_color = np.asarray(high_color, dtype=np.uint8)
+    low_color = np.asarray(low_color, dtype=np.uint8)
+
+    hsv_frames, valid_frames = [], []
+    for frame in frames:
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        # Même seuillage que threshold_filter() (les pixels hors du masque de couleur sont noirs, donc rejetés)
+        bright = cv2.threshold(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), 50, 255, cv2.THRESH_BINARY)[1]
+        hsv_frames.append(hsv)
+        valid_frames.append(cv2.bitwise_and(bright, cv2.inRange(hsv, np.zeros(3, np.uint8), high_color)))
+
+    # Rectangle englobant les pixels du masque le plus large sur toutes les images
+    loosest = np.zeros(hsv_frames[0].shape[:2], dtype=np.uint8)
+    for hsv, valid in zip(hsv_frames, valid_frames):
+        cv2.bitwise_or(loosest, cv2.bitwise_and(valid, cv2.inRange(hsv, low_color, high_color)), dst=loosest)
+    x0, y0, width, height = cv2.boundingRect(loosest)
+
+    count = len(frames)
+    hsv_crop = np.zeros((count, height+1, width, 3), dtype=np.uint8)
+    valid_crop = np.zeros((count, height+1, width), dtype=np.uint8)
+    for i in range(count):
+        hsv_crop[i,:height] = hsv_frames[i][y0:y0+height, x0:x0+width]
+        valid_crop[i,:height] = valid_frames[i][y0:y0+height, x0:x0+width]
+
+    return hsv_crop, valid_crop, (x0, y0)
+
+def stack_positions(masks, offset):
+    """
+    Calcule la position du joueur (centre du plus grand rectangle englobant) sur chaque masque d'une pile, avec
+    une seule recherche de composantes connexes pour toutes les images (voir hsv_stack()).
+
+    Retourne :
+    tuple (np.ndarray, np.ndarray)
+        - Positions (x, y) dans l'image entière, de forme (nombre d'images, 2) ; (0, 0) si aucun objet.
+        - Aire (en pixels) de l'objet retenu sur chaque image (0 si aucun objet).
+    """
+    count, height, width = masks.shape
+    positions = np.zeros((count, 2), dtype=np.int64)
+    areas = np.zeros(count, dtype=np.int64)
+    if width == 0 or height <= 1:
+        return positions, areas
+
+    stats = cv2.connectedComponentsWithStats(masks.reshape(count*height, width), connectivity=8)[2][1:]
+    if len(stats) == 0:
+        return positions, areas
+
+    x, y, w, h, area = (stats[:,i].astype(np.int64) for i in range(5))
+    frame = y // height
+    y = y - frame*height
+
+    # Plus grand rectangle de chaque image (à égalité, le premier dans l'ordre de balayage, comme select_player())
+    order = np.lexsort((np.arange(len(stats)), -w*h, frame))
+    first = order[np.r_[True, frame[order][1:] != frame[order][:-1]]]
+
+    positions[frame[first],0] = (2*x[first] + w[first])//2 + offset[0]
+    positions[frame[first],1] = (2*y[first] + h[first])//2 + offset[1]
+    areas[frame[first]] = area[first]
+    return positions, areas
+
+def evaluate_filter(hsv, valid, offset, low_color, high_color=None, tolerance=1, chunk=2):
+    """
+    Évalue des bornes HSV sur une pile d'images préparée par hsv_stack().
+
+    Critère de automatic_filter_determination() : le joueur doit être détecté sur la première image et sa
+    position sur toutes les images suivantes doit rester à moins de 'tolerance' pixels de celle-ci.
+    Les images sont traitées par paquets de taille croissante ('chunk', puis le double...) : des bornes
+    instables sont rejetées dès le premier paquet en défaut, sans traiter les images suivantes.
+
+    Paramètres :
+    high_color : tuple (int, int, int) ou None
+        Borne haute, inférieure ou égale à celle donnée à hsv_stack() (None : celle donnée à hsv_stack()).
+
+    Retourne :
+    tuple (bool, float, int)
+        - True si la détection est stable sur toutes les images.
+        - Aire moyenne (en pixels) du joueur sur les images traitées.
+        - Nombre d'images consécutives, depuis la première, où la détection est stable.
+    """
+    count, height, width, _ = hsv.shape
+    if hsv.size == 0:
+        return False, 0.0, 0  # Recadrage vide : joueur absent de toutes les images
+
+    low_color = np.asarray(low_color, dtype=np.uint8)
+    high_color = np.full(3, 255, dtype=np.uint8) if high_color is None else np.asarray(high_color, dtype=np.uint8)
+
+    reference = None
+    areas = []
+    start = 0
+    while start < count:
+        stop = min(start + chunk, count)
+        hsv_chunk = hsv[start:stop].reshape((stop-start)*height, width, 3)
+        mask = cv2.bitwise_and(cv2.inRange(hsv_chunk, low_color, high_color), valid[start:stop].reshape((stop-start)*height, width))
+        positions, chunk_areas = stack_positions(mask.reshape(stop-start, height, width), offset)
+        areas.append(chunk_areas)
+
+        if reference is None:
+            reference = positions[0]
+            if reference[0] == 0 and reference[1] == 0:
+                return False, 0.0, 0
+        unstable = np.any(np.abs(positions - reference) > tolerance, axis=1)
+        if unstable.any():
+            return False, float(np.concatenate(areas).mean()), start + int(np.argmax(unstable))
+
+        start = stop
+        chunk *= 2
+
+    return True, float(np.concatenate(areas).mean()), count
+
+def cached_filter_determination(frames, low_test=(161,145,75), high_test=(172,160,90), high_color=(179,255,255), tolerance=1):
+    """
+    Même recherche que automatic_filter_determination(), évaluée sur des images capturées une seule fois.
+
+    Chaque triplet (h, s, v) avec low_test <= (h, s, v) < high_test est utilisé comme borne basse (la borne
+    haute reste 'high_color') et conservé si la détection est stable sur toutes les images (même critère).
+
+    Paramètres :
+    frames : list de np.ndarray
+        Images BGR de la caméra (la première sert de référence), voir capture_frames().
+
+    Retourne :
+    list de tuple (int, int, int)
+        Bornes basses retenues, de la plus grande à la plus petite aire moyenne du joueur détecté.
+    """
+    hsv, valid, offset = hsv_stack(frames, low_test, high_color)
+    if hsv.size == 0:
+        return []  # Aucun pixel retenu par les bornes les plus larges : aucune borne stable
+
+    posible_hsv = []  # Liste des bornes basses retenues et de l'aire moyenne du joueur
+    for h in range(low_test[0], high_test[0]):
+        for s in range(low_test[1], high_test[1]):
+            for v in range(low_test[2], high_test[2]):
+                stable, area, _ = evaluate_filter(hsv, valid, offset, (h,s,v), None, tolerance)
+                if stable:
+                    posible_hsv.append(((h,s,v), area))
+
+    posible_hsv.sort(key=lambda item: item[1], reverse=True)
+    return [hsv_low for hsv_low, area in posible_hsv]
+
+#--------- Recherche parallèle par raffinements successifs ---------
+
+search_stack = {}  # Pile d'images d'un processus de recherche, en mémoire partagée (voir attach_stack())
+
+def attach_stack(names, shapes, offset, tolerance):
+    """
+    Initialisation d'un processus de recherche : accès sans copie à la pile d'images placée en mémoire partagée.
+    """
+    memories = [shared_memory.SharedMemory(name=name) for name in names]
+    search_stack["memories"] = memories  # Référence conservée pour garder la mémoire ouverte
+    search_stack["hsv"] = np.ndarray(shapes[0], dtype=np.uint8, buffer=memories[0].buf)
+    search_stack["valid"] = np.ndarray(shapes[1], dtype=np.uint8, buffer=memories[1].buf)
+    search_stack["offset"] = offset
+    search_stack["tolerance"] = tolerance
+
+def evaluate_candidates(candidates):
+    """
+    Évalue une liste de bornes (low, high) sur la pile d'images du processus.
+
+    Retourne :
+    list de tuple (tuple, tuple, bool, float, int)
+        Pour chaque borne : low, high, puis le résultat de evaluate_filter().
+    """
+    results = []
+    for low, high in candidates:
+        results.append((low, high) + evaluate_filter(search_stack["hsv"], search_stack["valid"], search_stack["offset"], low, high, search_stack["tolerance"]))
+    return results
+
+def candidate_grid(low_range, high_range, step):
+    """
+    Retourne toutes les bornes (low, high) de la grille de pas 'step' ; chaque intervalle de 'low_range' et de
+    'high_range' est de la forme (début, fin) avec la fin exclue, comme range().
+    """
+    axes = [range(start, stop, step) if stop - start > 1 else range(start, stop) for start, stop in tuple(low_range) + tuple(high_range)]
+    return [(values[:3], values[3:]) for values in itertools.product(*axes) if all(l <= h for l, h in zip(values[:3], values[3:]))]
+
+def neighbour_candidates(seeds, low_range, high_range, step, radius):
+    """
+    Retourne les bornes de pas 'step' situées à moins de 'radius' de chaque borne de départ, dans les intervalles de recherche.
+    """
+    limits = tuple(low_range) + tuple(high_range)
+    offsets = range(-(radius//step)*step, radius+1, step)
+    candidates = set()
+    for low, high in seeds:
+        axes = [sorted({min(max(value + offset, start), stop-1) for offset in offsets}) for value, (start, stop) in zip(low + high, limits)]
+        for values in itertools.product(*axes):
+            if all(l <= h for l, h in zip(values[:3], values[3:])):
+                candidates.add((values[:3], values[3:]))
+    return sorted(candidates)
+
+def parallel_filter_determination(frames, low_range=((161,172),(145,160),(75,90)), high_range=((179,180),(255,256),(255,256)), tolerance=1, steps=(4,2,1), best=5, workers=None):
+    """
+    Recherche des bornes HSV (basses et hautes) donnant une détection stable, répartie sur tous les cœurs.
+
+    La pile d'images (voir hsv_stack()) est placée une seule fois en mémoire partagée, sans copie vers chaque
+    processus. La recherche commence sur une grille grossière de pas steps[0], puis chaque pas suivant n'évalue
+    que le voisinage des 'best' meilleures bornes du pas précédent. Avec steps=(1,), la grille entière est évaluée.
+
+    Paramètres :
+    frames : list de np.ndarray
+        Images BGR de la caméra (la première sert de référence), voir capture_frames().
+    low_range, high_range : tuple de 3 tuple (int, int)
+        Intervalles (début, fin exclue) de chaque composante H, S, V des bornes basses et hautes.
+    tolerance : int
+        Écart maximal (en pixels) entre la position du joueur sur chaque image et sur la première.
+    steps : tuple de int
+        Pas successifs de la recherche, décroissants.
+    best : int
+        Nombre de bornes dont le voisinage est exploré au pas suivant.
+    workers : int ou None
+        Nombre de processus (par défaut, le nombre de cœurs de la machine).
+
+    Retourne :
+    list de tuple (tuple (int, int, int), tuple (int, int, int))
+        Bornes (low, high) donnant une détection stable, de la plus grande à la plus petite aire moyenne du joueur.
+    """
+    workers = workers or os.cpu_count()
+    loosest_low = tuple(start for start, stop in low_range)
+    loosest_high = tuple(stop-1 for start, stop in high_range)
+    hsv, valid, offset = hsv_stack(frames, loosest_low, loosest_high)
+    if hsv.size == 0:
+        return []  # Aucun pixel retenu par les bornes les plus larges : aucune borne stable, inutile de lancer les processus
+
+    # Copie de la pile d'images en mémoire partagée
+    memories = []
+    for array in (hsv, valid):
+        memory = shared_memory.SharedMemory(create=True, size=array.nbytes)
+        np.ndarray(array.shape, dtype=np.uint8, buffer=memory.buf)[:] = array
+        memories.append(memory)
+
+    evaluated = {}  # Résultats de chaque borne déjà évaluée : (low, high) -> (stable, aire, images stables)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_stack, initargs=([memory.name for memory in memories], (hsv.shape, valid.shape), offset, tolerance)) as executor:
+            for level, step in enumerate(steps):
+                if level == 0:
+                    candidates = candidate_grid(low_range, high_range, step)
+                else:
+                    ranking = sorted(evaluated, key=lambda bounds: (evaluated[bounds][0], evaluated[bounds][2], evaluated[bounds][1]), reverse=True)
+                    candidates = neighbour_candidates(ranking[:best], low_range, high_range, step, steps[level-1]//2)
+                candidates = [bounds for bounds in candidates if bounds not in evaluated]
+
+                # Paquets de bornes répartis entre les processus
+                batch_count = 4*workers
+                batches = [candidates[i::batch_count] for i in range(batch_count) if candidates[i::batch_count]]
+                for results in executor.map(evaluate_candidates, batches):
+                    for low, high, stable, area, stable_frames in results:
+                        evaluated[(low, high)] = (stable, area, stable_frames)
+
+                print(f"Pas {step} : {len(candidates)} bornes évaluées, {sum(result[0] for result in evaluated.values())} stables au total")
+    finally:
+        for memory in memories:
+            memory.close()
+            memory.unlink()
+
+    stable_bounds = [(bounds, result[1]) for bounds, result in evaluated.items() if result[0]]
+    stable_bounds.sort(key=lambda item: item[1], reverse=True)
+    return [bounds for bounds, area in stable_bounds]
+
 #--------- Fonctions pour obtenir un filtre de couleur du pixel cliqué ---------
 
 # Valeur HSV initiale, utilisée comme point de départ pour le filtrage des couleurs
@@ -189,7 +483,7 @@ def get_hsv_color(event, x, y, flags, param):
         # Convertit la couleur du format BGR en HSV et stocke le résultat dans hsv_pixel
         hsv_pixel = cv2.cvtColor(np.uint8([[pixel]]), cv2.COLOR_BGR2HSV)[0][0]  
 
-def filter_determination(capture, camera_name):
+def filter_determination(capture, camera_name, initial_range=50, initial_pixel=None, return_settings=False):
     """
     Fonction permettant de déterminer un filtre HSV basé sur un clic de souris.
 
@@ -198,13 +492,20 @@ def filter_determination(capture, camera_name):
     - Applique un filtre autour de cette couleur avec une plage définie ('range_value').
     - Affiche l'image originale et l'image filtrée en temps réel.
     - Quitte lorsque la touche 'Échap' (ESC) est pressée.
+
+    La largeur initiale du filtre ('initial_range') et la couleur HSV initiale ('initial_pixel') permettent de
+    repartir d'un profil enregistré (voir Profils_filtres.py). Si 'return_settings' vaut True, la largeur du
+    filtre et la couleur HSV choisies sont aussi renvoyées.
     """
     global hsv_pixel  # Variable globale contenant la valeur HSV sélectionnée
 
+    if initial_pixel is not None:
+        hsv_pixel = np.array(initial_pixel)
+
     cv2.namedWindow(camera_name)  # Crée une fenêtre d'affichage OpenCV
 
     cv2.createTrackbar("Largeur filtre :", camera_name, 0, 100, nothing) # Créer une trackbar pour ajuster la plage HSV
-    cv2.setTrackbarPos("Largeur filtre :", camera_name, 50)  # Modifier la position initiale à 50
+    cv2.setTrackbarPos("Largeur filtre :", camera_name, initial_range)  # Modifier la position initiale
 
     while True:
         ret, frame = capture.read()  # Capture une nouvelle image depuis la caméra
@@ -258,6 +559,8 @@ def filter_determination(capture, camera_name):
     cv2.destroyAllWindows()
 
     # Retourner les bornes HSV utilisées pour le filtrage
+    if return_settings:
+        return low_color, high_color, range_value, (h, s, v)
     return low_color, high_color
 
 
@@ -265,4 +568,7 @@ def filter_determination(capture, camera_name):
 
 #code_hsv_color()
 #manual_filter_determination()
-#automatic_filter_determination()
\ No newline at end of file
+#automatic_filter_determination()
+#print(cached_filter_determination(capture_frames(cv2.VideoCapture(1), 51)))
+#if __name__ == "__main__":
+#    print(parallel_filter_determination(capture_frames(cv2.VideoCapture(1), 51))[:10])
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+Nom du fichier : Enregistrement_stereo.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Ce script permet d'enregistrer les images brutes des deux caméras avec leurs instants de capture, puis de
+    les relire à la place des caméras dans le programme principal. L'enregistrement est un dossier contenant
+    les images à la suite dans un fichier binaire, lu en mémoire projetée (sans copie) lors de la relecture,
+    ce qui permet de mesurer chaque modification de la détection sur exactement les mêmes images.
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+import numpy as np
+
+# Noms des fichiers d'un enregistrement
+images_file = "images.raw"         # Paires d'images BGR brutes, les unes à la suite des autres
+timestamps_file = "instants.npy"  # Instants de capture (en s) de chaque paire : [gauche, droite]
+infos_file = "infos.json"          # Dimensions des images, nombre de paires et noms des caméras
+
+class StereoRecorder:
+    """
+    Classe enregistrant les paires d'images gauche/droite et leurs instants de capture dans un dossier.
+
+    L'écriture sur le disque est faite par un thread dédié pour ne pas ralentir la boucle principale.
+    """
+    def __init__(self, path, camera_left="Gauche", camera_right="Droite", queue_size=64):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.infos = {"count": 0, "shape": None, "camera_left": camera_left, "camera_right": camera_right}
+        self.timestamps = []
+
+        self.file = open(os.path.join(path, images_file), "wb")
+        self.queue = queue.Queue(maxsize=queue_size)  # Paires en attente d'écriture (bloquant si le disque est trop lent)
+
+        # Lancement d'un thread en mode daemon pour écrire les images sur le disque
+        self.thread_write = threading.Thread(target=self.write_continuously, daemon=True)
+        self.thread_write.start()
+
+    def write_continuously(self):
+        """Écrit sur le disque les paires d'images mises en attente, jusqu'à la réception de None"""
+        while True:
+            pair = self.queue.get()
+            if pair is None:
+                break
+            for frame in pair:
+                self.file.write(np.ascontiguousarray(frame).data)
+
+    def write(self, frame_left, frame_right, timestamp_left, timestamp_right):
+        """
+        Ajoute une paire d'images à l'enregistrement. Toutes les images doivent avoir les mêmes dimensions.
+        """
+        if self.infos["shape"] is None:
+            self.infos["shape"] = list(frame_left.shape)
+        elif list(frame_left.shape) != self.infos["shape"] or list(frame_right.shape) != self.infos["shape"]:
+            print("\033[31mDimensions d'image différentes : paire non enregistrée\033[0m")
+            return
+
+        self.queue.put((frame_left, frame_right))
+        self.timestamps.append((timestamp_left, timestamp_right))
+        self.infos["count"] += 1
+
+    def close(self):
+        """Termine l'écriture des images puis enregistre les instants de capture et les informations"""
+        self.queue.put(None)
+        self.thread_write.join()
+        self.file.close()
+
+        np.save(os.path.join(self.path, timestamps_file), np.array(self.timestamps, dtype=np.float64).reshape(-1, 2))
+        with open(os.path.join(self.path, infos_file), "w") as file:
+            json.dump(self.infos, file, indent=4)
+
+        print(f"Enregistrement de {self.infos['count']} paires d'images dans \033[34m{self.path}\033[0m")
+
+def load_recording(path):
+    """
+    Ouvre un enregistrement en mémoire projetée (lecture seule, sans copie).
+
+    Retourne :
+    tuple (np.memmap, np.ndarray, dict)
+        - Images de forme (nombre de paires, 2, hauteur, largeur, 3) ; l'indice 0 est la caméra gauche.
+        - Instants de capture de forme (nombre de paires, 2).
+        - Informations de l'enregistrement.
+    """
+    with open(os.path.join(path, infos_file)) as file:
+        infos = json.load(file)
+
+    shape = (infos["count"], 2) + tuple(infos["shape"])
+    images = np.memmap(os.path.join(path, images_file), dtype=np.uint8, mode="r", shape=shape)
+    timestamps = np.load(os.path.join(path, timestamps_file))
+
+    return images, timestamps, infos
+
+class StereoReplay:
+    """
+    Classe relisant un enregistrement avec la même interface que StereoCapture (voir Capture_cameras.py).
+
+    En mode temps réel, la paire renvoyée est celle qui aurait été la plus récente au même instant de la séance
+    d'origine (des paires sont sautées si le traitement est trop lent). Sinon, les paires sont renvoyées une à
+    une, aussi vite que la boucle les demande. Les images renvoyées sont des vues en lecture seule du fichier.
+    """
+    def __init__(self, path, realtime=True):
+        self.images, self.timestamps, self.infos = load_recording(path)
+        self.realtime = realtime
+        self.count = self.infos["count"]
+
+        # Instant de disponibilité de chaque paire par rapport au début de l'enregistrement
+        if self.count > 0:
+            self.times = self.timestamps.max(axis=1) - self.timestamps[0].max()
+        else:
+            self.times = np.zeros(0)
+
+        self.index = -1    # Indice de la dernière paire renvoyée
+        self.start = None  # Instant de la première lecture
+        self.last_timestamps = (0, 0)
+
+    def target_index(self):
+        """Indice de la paire la plus récente à l'instant actuel de la relecture"""
+        elapsed = time.monotonic() - self.start
+        return int(np.searchsorted(self.times, elapsed, side="right")) - 1
+
+    def read(self, timeout=0):
+        """
+        Retourne la paire d'images suivante de l'enregistrement, au même format que StereoCapture.read().
+        """
+        if self.start is None:
+            self.start = time.monotonic()
+
+        if self.realtime:
+            target = self.target_index()
+            if target <= self.index and timeout > 0 and self.index+1 < self.count:
+                # En avance sur l'enregistrement : attente de la paire suivante (au plus 'timeout' secondes)
+                time.sleep(max(min(timeout, self.start + self.times[self.index+1] - time.monotonic()), 0))
+                target = self.target_index()
+            is_new = target > self.index
+            if not is_new and self.index == self.count-1:
+                return False, None, None, 0, False  # Dernière paire déjà renvoyée : fin de la relecture
+            self.index = max(target, self.index, 0)
+        else:
+            self.index += 1
+            is_new = True
+
+        if self.index >= self.count:
+            return False, None, None, 0, False
+
+        timestamp_left, timestamp_right = self.timestamps[self.index]
+        self.last_timestamps = (timestamp_left, timestamp_right)
+
+        return True, self.images[self.index,0], self.images[self.index,1], abs(timestamp_left - timestamp_right), is_new
+
+    def camera(self, side):
+        """Retourne une caméra relue (0 : gauche, 1 : droite) utilisable à la place d'un cv2.VideoCapture"""
+        return ReplayCamera(self, side)
+
+    def release(self):
+        self.images = None
+
+class ReplayCamera:
+    """
+    Caméra relue renvoyant l'image courante de la relecture d'un côté, avec l'interface de cv2.VideoCapture.read().
+    """
+    def __init__(self, replay, side):
+        self.replay = replay
+        self.side = side
+
+    def read(self):
+        if self.replay.count == 0:
+            return False, None
+        index = min(max(self.replay.index, 0), self.replay.count-1)
+        return True, self.replay.images[index,self.side]
+
+    def isOpened(self):
+        return self.replay.count > 0
+
+    def release(self):
+        pass
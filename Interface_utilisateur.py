@@ -43,6 +43,7 @@ def input_analysis(written_value):
     radius = False
     permanent_depth = False
     permanent_width = False
+    latency = False
     if isinstance(written_value, str):
         if written_value in ["True","true","False","false"]:
             return (1, written_value)
@@ -58,6 +59,8 @@ def input_analysis(written_value):
             permanent_depth = True
         elif written_value[0] in ["L","l"]:
             permanent_width = True
+        elif written_value[0] in ["S","s"]:
+            latency = True
         written_value = written_value[1:]
     try:
         written_value = int(written_value)
@@ -72,6 +75,8 @@ def input_analysis(written_value):
             return (6, abs_written_value)
         elif permanent_width:
             return (7, written_value)
+        elif latency:
+            return (9, abs_written_value)
         else:
             return (8, written_value)
     except:
@@ -102,4 +107,5 @@ def difficulty_choice():
     print("- 'F' : Ajuster la fréquence de mis à jour du lanceur")
     print("- 'R' : Modifier le rayon de difficulté")
     print("- 'P' : Changer la profondeur de la position permanente du tir du volant")
-    print("- 'L' : Changer la largeur de la position permanente du tir du volant\n")
+    print("- 'L' : Changer la largeur de la position permanente du tir du volant")
+    print("- 'S' : Afficher (S1) ou masquer (S0) les latences de chaque étape de la boucle\n")
@@ -0,0 +1,120 @@
+"""
+Nom du fichier : Mesure_latence.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Ce script mesure la durée de chaque étape de la boucle principale (capture, détection, triangulation,
+    affichage, envoi série...) avec un coût négligeable : un seul appel d'horloge par étape. Les durées des
+    dernières boucles sont conservées pour calculer les percentiles de latence et la fréquence de la boucle,
+    affichables sur l'image et enregistrables périodiquement dans un fichier.
+"""
+
+import json
+import time
+import cv2
+import numpy as np
+
+class StageTimer:
+    """
+    Classe chronométrant les étapes successives de la boucle principale.
+
+    Utilisation : new_loop() au début de chaque boucle, puis lap("étape") à la fin de chaque étape. La durée
+    d'une étape est le temps écoulé depuis l'appel précédent. Seules les 'window' dernières mesures de chaque
+    étape sont conservées (tampons circulaires).
+    """
+    def __init__(self, window=300, dump_path=None, dump_period=5):
+        self.window = window            # Nombre de boucles conservées pour les statistiques
+        self.dump_path = dump_path      # Fichier d'enregistrement périodique (une ligne JSON par enregistrement), None pour désactiver
+        self.dump_period = dump_period  # Période d'enregistrement (en s)
+
+        self.durations = {}                     # Durées des étapes (en ms) : nom -> tampon circulaire
+        self.counts = {}                        # Nombre de mesures de chaque étape
+        self.loop_durations = np.zeros(window)  # Durées complètes des boucles (en ms)
+        self.loop_count = 0
+
+        self.loop_start = None
+        self.last_lap = None
+        self.last_dump = time.monotonic()
+
+    def new_loop(self):
+        """Termine la boucle précédente et commence une nouvelle boucle"""
+        now = time.perf_counter()
+        if self.loop_start is not None:
+            self.loop_durations[self.loop_count % self.window] = (now - self.loop_start)*1000
+            self.loop_count += 1
+        self.loop_start = now
+        self.last_lap = now
+
+        if self.dump_path is not None and time.monotonic() - self.last_dump >= self.dump_period:
+            self.dump()
+
+    def lap(self, stage):
+        """Enregistre la durée de l'étape 'stage', écoulée depuis le dernier appel"""
+        now = time.perf_counter()
+        if stage not in self.durations:
+            self.counts[stage] = 0
+            self.durations[stage] = np.zeros(self.window)
+        self.durations[stage][self.counts[stage] % self.window] = (now - self.last_lap)*1000
+        self.counts[stage] += 1
+        self.last_lap = now
+
+    def statistics(self):
+        """
+        Calcule les percentiles de latence de chaque étape et la fréquence de la boucle.
+
+        Retourne :
+        dict
+            {"fps": ..., "loop": {"p50", "p95", "p99"}, "stages": {étape: {"p50", "p95", "p99"}}} (durées en ms).
+        """
+        def percentiles(values):
+            if len(values) == 0:
+                return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+        loops = self.loop_durations[:min(self.loop_count, self.window)]
+        stages = {stage: percentiles(values[:min(self.counts[stage], self.window)]) for stage, values in list(self.durations.items())}  # Copie : appel possible depuis le fil d'affichage
+
+        return {
+            "fps": float(1000/np.mean(loops)) if len(loops) else 0.0,
+            "loop": percentiles(loops),
+            "stages": stages,
+        }
+
+    def summary(self):
+        """
+        Retourne la fréquence de la boucle et les percentiles de chaque étape sous forme de lignes de texte.
+        """
+        stats = self.statistics()
+        lines = [f"Boucle : {stats['fps']:.1f} fps  p50 {stats['loop']['p50']:.1f}  p95 {stats['loop']['p95']:.1f}  p99 {stats['loop']['p99']:.1f} ms"]
+        for stage, values in stats["stages"].items():
+            lines.append(f"{stage} : p50 {values['p50']:.1f}  p95 {values['p95']:.1f}  p99 {values['p99']:.1f} ms")
+        return lines
+
+    def overlay(self, img, origin=(15,30), fontFace=1, fontScale=1.5, color=(255,255,255), thickness=2):
+        """
+        Affiche sur l'image la fréquence de la boucle et les percentiles de chaque étape.
+
+        Retourne :
+        tuple
+            Rectangle (x_min, y_min, x_max, y_max) modifié sur l'image.
+        """
+        x, y = origin
+        line_height = int(22*fontScale)
+        lines = self.summary()
+
+        width_max = 0
+        for i, line in enumerate(lines):
+            position = (x, y + i*line_height)
+            cv2.putText(img, line, position, fontFace, fontScale, (0,0,0), thickness+3)  # Contour pour la lisibilité
+            cv2.putText(img, line, position, fontFace, fontScale, color, thickness)
+            width_max = max(width_max, cv2.getTextSize(line, fontFace, fontScale, thickness+3)[0][0])
+
+        return (x - thickness - 3, y - line_height - thickness - 3, x + width_max + thickness + 3, y + len(lines)*line_height + thickness + 3)
+
+    def dump(self):
+        """Ajoute les statistiques actuelles au fichier d'enregistrement (une ligne JSON)"""
+        self.last_dump = time.monotonic()
+        record = {"time": time.time(), **self.statistics()}
+        with open(self.dump_path, "a") as file:
+            file.write(json.dumps(record) + "\n")
@@ -0,0 +1,216 @@
+"""
+Nom du fichier : Mesure_performances.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Ce script mesure le temps d'exécution des traitements les plus coûteux du programme principal sur des
+    images synthétiques (détection, triangulation, terrain fictif, textes), pour plusieurs résolutions et nombres
+    d'objets parasites. Les débits et percentiles de latence sont enregistrés afin de comparer les versions.
+"""
+
+import os
+import json
+import time
+import datetime
+import cv2
+import numpy as np
+from Detection_joueur import red_filter, threshold_filter, color_lookup_table, final_frame, detect_player, render_view
+from Variables_positions import player_variable, difficulty_variable, permanent_variable, dimension_scale
+from Terrain_badminton import badminton_court, representation, CourtRenderer
+from Texte_image import image_display
+
+# Bornes HSV utilisées pour les mesures (rouge du maillot du joueur)
+low_color_test = np.array([160,120,70])
+high_color_test = np.array([179,255,255])
+
+def synthetic_frame(height=1080, width=1920, seed=0):
+    """
+    Génère une image BGR de bruit aléatoire contenant un rectangle rouge (le joueur).
+    """
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    cv2.rectangle(frame, (int(width*0.45), int(height*0.3)), (int(width*0.55), int(height*0.8)), (30,20,200), -1)
+    return frame
+
+def timing(function, repetitions):
+    """
+    Exécute 'repetitions' fois la fonction (après un premier appel de chauffe) et renvoie la durée de chaque appel (en ms).
+    """
+    function()
+    durations = []
+    for i in range(repetitions):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start)*1000)
+    return np.array(durations)
+
+def benchmark_segmentation(repetitions=50, bits=5):
+    """
+    Compare la segmentation HSV actuelle (red_filter puis threshold_filter) à la segmentation par table de
+    correspondance sur une image Full HD, et affiche la proportion de pixels classés de la même façon.
+    """
+    frame = synthetic_frame()
+
+    start = time.perf_counter()
+    lookup_table = color_lookup_table(low_color_test, high_color_test, bits)
+    duration_table = (time.perf_counter() - start)*1000
+
+    hsv_durations = timing(lambda: threshold_filter(red_filter(frame, low_color_test, high_color_test)), repetitions)
+    table_durations = timing(lambda: lookup_table.mask(frame), repetitions)
+
+    agreement = np.mean(threshold_filter(red_filter(frame, low_color_test, high_color_test)) == lookup_table.mask(frame))
+
+    print(f"Calcul de la table ({bits} bits par canal) : {duration_table:.1f} ms")
+    print(f"Filtre HSV + seuillage          : {np.median(hsv_durations):.2f} ms (médiane)")
+    print(f"Table de correspondance         : {np.median(table_durations):.2f} ms (médiane)")
+    print(f"Gain                            : x{np.median(hsv_durations)/np.median(table_durations):.2f}")
+    print(f"Pixels identiques               : {100*agreement:.2f} %\n")
+
+#--------- Suite de mesures des traitements de la boucle principale ---------
+
+results_file = "Mesures_performances.json"  # Historique des mesures, une entrée par version mesurée
+
+# Paramètres de l'installation utilisés pour les mesures (proches de ceux du programme principal)
+baseline_test = 720
+vision_field_left_test = 1.15
+vision_field_right_test = 1.19
+scope_launcher_test = np.pi/2
+
+def synthetic_scene(height=1080, width=1920, blob_count=0, seed=0):
+    """
+    Génère une image BGR d'un gymnase uniforme et bruité, avec le joueur (grand rectangle rouge) à une position
+    connue et 'blob_count' petits objets rouges parasites.
+
+    Retourne :
+    tuple (np.ndarray, tuple (int, int))
+        - Image BGR.
+        - Position attendue du joueur (centre de son rectangle).
+    """
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width, 3), (90,110,120), dtype=np.uint8)
+    frame += rng.integers(0, 20, frame.shape, dtype=np.uint8)
+
+    # Objets parasites de quelques pixels
+    size = max(width//400, 2)
+    for x, y in zip(rng.integers(0, width-size, blob_count), rng.integers(0, height-size, blob_count)):
+        cv2.rectangle(frame, (int(x), int(y)), (int(x)+size, int(y)+size), (30,20,200), -1)
+
+    # Joueur
+    x0, y0, x1, y1 = int(width*0.45), int(height*0.3), int(width*0.55), int(height*0.8)
+    cv2.rectangle(frame, (x0, y0), (x1, y1), (30,20,200), -1)
+
+    return frame, (int((x0 + x1 + 1) / 2), int((y0 + y1 + 1) / 2))
+
+def statistics(durations):
+    """
+    Résume une série de durées (en ms) : moyenne, percentiles de latence et débit (en appels par seconde).
+    """
+    return {
+        "mean": float(np.mean(durations)),
+        "p50": float(np.percentile(durations, 50)),
+        "p95": float(np.percentile(durations, 95)),
+        "p99": float(np.percentile(durations, 99)),
+        "throughput": float(1000/np.mean(durations)),
+    }
+
+def benchmark_stages(resolutions=((640,360),(1280,720),(1920,1080)), blob_counts=(0,100,1000), repetitions=50):
+    """
+    Mesure chaque étape de la boucle principale sur des images synthétiques.
+
+    Retourne :
+    dict
+        Statistiques de chaque mesure, indexées par "étape/largeurxhauteur/nombre d'objets" pour la détection
+        et par le nom de l'étape pour les traitements indépendants des images.
+    """
+    results = {}
+
+    # Détection du joueur
+    for (width, height) in resolutions:
+        for blob_count in blob_counts:
+            frame, expected = synthetic_scene(height, width, blob_count)
+            key = f"{width}x{height}/{blob_count}"
+
+            position = detect_player(frame, low_color_test, high_color_test).position
+            if abs(position[0]-expected[0]) > 1 or abs(position[1]-expected[1]) > 1:
+                print(f"\033[31mPosition détectée {position} différente de la position attendue {expected} ({key})\033[0m")
+
+            results[f"final_frame/{key}"] = statistics(timing(lambda: final_frame(frame, low_color_test, high_color_test, False), repetitions))
+            results[f"detect_player/{key}"] = statistics(timing(lambda: render_view(detect_player(frame, low_color_test, high_color_test), "Sans modification", True), repetitions))
+            results[f"detect_player_pyramide/{key}"] = statistics(timing(lambda: detect_player(frame, low_color_test, high_color_test, None, None, 2), repetitions))
+
+    # Triangulation et difficulté
+    frame, _ = synthetic_scene()
+    position_left, position_right = (1100, 540), (800, 540)  # Joueur à environ 3,5 m des caméras
+    depth_player, width_player, angle_left, angle_right, total_angle_left, total_angle_right, azimut = player_variable(frame, baseline_test, position_left, position_right, vision_field_left_test, vision_field_right_test)
+    results["player_variable"] = statistics(timing(lambda: player_variable(frame, baseline_test, position_left, position_right, vision_field_left_test, vision_field_right_test), repetitions))
+
+    scale = dimension_scale()
+    baseline_court = int(baseline_test/scale)
+    radius_difficulty_court = int(1000/scale)
+    court = badminton_court(baseline_court, scope_launcher_test, vision_field_left_test, vision_field_right_test, (183,107,0), (0,255,255), (0,0,255), [True])
+    results["badminton_court"] = statistics(timing(lambda: badminton_court(baseline_court, scope_launcher_test, vision_field_left_test, vision_field_right_test, (183,107,0), (0,255,255), (0,0,255), [True]), repetitions))
+
+    for level in (1, 2, 3):
+        results[f"difficulty_variable/niveau{level}"] = statistics(timing(lambda: difficulty_variable(court, depth_player, width_player, level, radius_difficulty_court, False), repetitions))
+
+    position_player_court, position_player_court_base, position_difficulty_court, position_difficulty_base, azimut_difficulty = difficulty_variable(court, depth_player, width_player, 2, radius_difficulty_court, False)
+    position_permanent_court = permanent_variable(court, [3000,0])[0]
+
+    # Terrain fictif et textes
+    results["representation"] = statistics(timing(lambda: representation(court, baseline_court, position_player_court, position_player_court_base, depth_player, width_player, total_angle_left, total_angle_right, azimut, radius_difficulty_court, position_difficulty_base, position_difficulty_court, azimut_difficulty, position_permanent_court, (255,0,147), (200,200,200), (0,255,255), (0,0,255), (255,0,0), (0,255,0), (255,255,0), (255,255,0), [True]), repetitions))
+    court_renderer = CourtRenderer(court, baseline_court, (0,255,255), (0,0,255))
+    results["CourtRenderer.render"] = statistics(timing(lambda: court_renderer.render(position_player_court, position_player_court_base, depth_player, width_player, total_angle_left, total_angle_right, azimut, radius_difficulty_court, position_difficulty_base, position_difficulty_court, azimut_difficulty, position_permanent_court, (255,0,147), (200,200,200), (255,0,0), (0,255,0), (255,255,0), (255,255,0), [True]), repetitions))
+    results["image_display"] = statistics(timing(lambda: image_display(frame, depth_player, width_player, position_left, angle_left, total_angle_left, azimut, 1, 2, (0,0,255), 2, [True], "Camera Gauche"), repetitions))
+
+    return results
+
+def print_results(results):
+    """
+    Affiche les statistiques de chaque mesure sous forme de tableau.
+    """
+    print(f"{'Mesure':<45}{'moy. (ms)':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'débit (/s)':>12}")
+    for name, stats in results.items():
+        print(f"{name:<45}{stats['mean']:>10.2f}{stats['p50']:>9.2f}{stats['p95']:>9.2f}{stats['p99']:>9.2f}{stats['throughput']:>12.1f}")
+    print()
+
+def save_results(results, label, path=results_file):
+    """
+    Ajoute les mesures d'une version (identifiée par 'label') à l'historique des mesures.
+    """
+    history = load_results(path)
+    history.append({"label": label, "date": datetime.datetime.now().isoformat(timespec="seconds"), "results": results})
+    with open(path, "w") as file:
+        json.dump(history, file, indent=4)
+
+def load_results(path=results_file):
+    """
+    Retourne l'historique des mesures (liste vide s'il n'existe pas encore).
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        return json.load(file)
+
+def compare_results(reference_label, label, path=results_file, tolerance=0.10):
+    """
+    Compare la latence médiane de deux versions de l'historique et signale les régressions supérieures à 'tolerance'.
+    """
+    history = {entry["label"]: entry["results"] for entry in load_results(path)}
+    reference, current = history[reference_label], history[label]
+
+    print(f"{'Mesure':<45}{reference_label:>12}{label:>12}{'écart':>10}")
+    for name in current:
+        if name not in reference:
+            continue
+        before, after = reference[name]["p50"], current[name]["p50"]
+        change = (after - before)/before if before > 0 else 0
+        color = "\033[31m" if change > tolerance else "\033[32m" if change < -tolerance else ""
+        print(f"{color}{name:<45}{before:>12.2f}{after:>12.2f}{100*change:>9.1f}%\033[0m")
+    print()
+
+if __name__ == "__main__":
+    benchmark_segmentation()
+
+    results = benchmark_stages()
+    print_results(results)
+    save_results(results, datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
@@ -0,0 +1,110 @@
+"""
+Nom du fichier : Modele_couleur.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Ce script fait évoluer les bornes HSV du filtre de couleur pendant la séance pour suivre les variations
+    d'éclairage du gymnase. Un histogramme HSV glissant des pixels du joueur détecté est mis à jour à faible
+    coût (uniquement dans le rectangle du joueur, et pas à chaque image), puis les bornes sont translatées
+    progressivement selon le déplacement de la couleur médiane du joueur, sans jamais s'éloigner de plus de
+    'max_shift' des bornes choisies au départ.
+"""
+
+import cv2
+import numpy as np
+
+channel_sizes = (180, 256, 256)  # Nombre de valeurs possibles de chaque canal HSV dans OpenCV
+
+class AdaptiveColorModel:
+    """
+    Classe adaptant les bornes HSV d'une caméra aux pixels du joueur détecté.
+
+    Toutes les 'period' images où le joueur est détecté, les pixels de son rectangle proches de la couleur
+    suivie (bornes de départ élargies de 'max_shift') sont ajoutés à un histogramme glissant de chaque canal.
+    Les bornes de départ sont ensuite translatées du déplacement de la médiane de l'histogramme depuis la
+    première mise à jour (la largeur du filtre est conservée), au plus de 'max_shift' au total et de
+    'max_step' par mise à jour.
+    """
+    def __init__(self, low_color, high_color, max_shift=(4,40,40), max_step=(1,4,4), learning_rate=0.3, period=10, min_pixels=200):
+        self.base_low = np.array(low_color, dtype=int)    # Bornes choisies au départ (profil ou sélection)
+        self.base_high = np.array(high_color, dtype=int)
+        self.low_color = self.base_low.copy()             # Bornes actuelles
+        self.high_color = self.base_high.copy()
+
+        self.max_shift = np.array(max_shift)      # Écart maximal aux bornes de départ (H, S, V)
+        self.max_step = np.array(max_step)        # Variation maximale des bornes à chaque mise à jour
+        self.learning_rate = learning_rate        # Poids des nouveaux pixels dans l'histogramme glissant
+        self.period = period                      # Nombre d'images avec joueur détecté entre deux mises à jour
+        self.min_pixels = min_pixels              # Nombre minimal de pixels du joueur pour une mise à jour
+
+        # Bornes les plus larges autorisées, utilisées pour sélectionner les pixels du joueur
+        self.search_low = np.maximum(self.base_low - self.max_shift, 0)
+        self.search_high = np.minimum(self.base_high + self.max_shift, np.array(channel_sizes) - 1)
+
+        self.histograms = [np.zeros(size) for size in channel_sizes]  # Histogrammes normalisés de H, S et V
+        self.reference = None # Médianes de H, S et V à la première mise à jour
+        self.count = 0        # Nombre d'images avec joueur détecté depuis le début
+        self.changed = False  # True si la dernière mise à jour a modifié les bornes
+
+    def reset(self):
+        """Revient aux bornes de départ et oublie l'histogramme"""
+        self.low_color = self.base_low.copy()
+        self.high_color = self.base_high.copy()
+        self.histograms = [np.zeros(size) for size in channel_sizes]
+        self.reference = None
+        self.changed = True
+
+    def update(self, frame, detection):
+        """
+        Met à jour le modèle avec la détection de l'image (PlayerDetection) et retourne les bornes à utiliser.
+
+        Retourne :
+        tuple (np.ndarray, np.ndarray)
+            Bornes HSV basses et hautes (l'attribut 'changed' indique si elles ont été modifiées).
+        """
+        self.changed = False
+        if detection.player_rectangle is None:
+            return self.low_color, self.high_color
+
+        self.count += 1
+        if self.count % self.period != 0:
+            return self.low_color, self.high_color
+
+        # Pixels du joueur : rectangle détecté, couleur proche de la couleur suivie et assez lumineux (comme threshold_filter())
+        x, y, w, h = detection.player_rectangle
+        patch = frame[y:y+h, x:x+w]
+        hsv_patch = cv2.cvtColor(patch, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(hsv_patch, self.search_low, self.search_high)
+        bright = cv2.threshold(cv2.cvtColor(patch, cv2.COLOR_BGR2GRAY), 50, 255, cv2.THRESH_BINARY)[1]
+        mask = cv2.bitwise_and(mask, bright)
+
+        pixels = cv2.countNonZero(mask)
+        if pixels < self.min_pixels:
+            return self.low_color, self.high_color
+
+        # Histogramme glissant et médiane de chaque canal
+        median = []
+        for channel, size in enumerate(channel_sizes):
+            histogram = cv2.calcHist([hsv_patch], [channel], mask, [size], [0, size]).ravel()/pixels
+            if self.histograms[channel].sum() == 0:
+                self.histograms[channel] = histogram
+            else:
+                self.histograms[channel] = (1-self.learning_rate)*self.histograms[channel] + self.learning_rate*histogram
+
+            cumulative = np.cumsum(self.histograms[channel])
+            median.append(np.searchsorted(cumulative, cumulative[-1]/2))
+        median = np.array(median)
+
+        if self.reference is None:
+            self.reference = median
+        shift = np.clip(median - self.reference, -self.max_shift, self.max_shift)
+
+        # Translation progressive des bornes de départ, dans les limites des canaux
+        low_color = self.low_color + np.clip(self.base_low + shift - self.low_color, -self.max_step, self.max_step)
+        high_color = self.high_color + np.clip(self.base_high + shift - self.high_color, -self.max_step, self.max_step)
+        low_color = np.clip(low_color, self.search_low, self.search_high)
+        high_color = np.clip(high_color, low_color, self.search_high)
+
+        self.changed = not (np.array_equal(low_color, self.low_color) and np.array_equal(high_color, self.high_color))
+        self.low_color, self.high_color = low_color, high_color
+        return self.low_color, self.high_color
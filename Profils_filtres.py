@@ -0,0 +1,80 @@
+"""
+Nom du fichier : Profils_filtres.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Ce script enregistre les filtres de couleur choisis pour chaque caméra (bornes HSV, largeur du filtre et
+    couleur du pixel cliqué) dans un fichier de profils, éventuellement pour plusieurs lieux ou éclairages.
+    Au lancement suivant, le programme principal recharge directement ces filtres sans ouvrir les fenêtres de
+    sélection, sauf si l'utilisateur demande explicitement de les choisir à nouveau.
+"""
+
+import os
+import json
+import datetime
+import numpy as np
+from Determination_filtre import filter_determination
+
+profiles_file = "Profils_filtres.json"  # Fichier des profils : caméra -> lieu -> filtre
+default_venue = "Défaut"                # Lieu utilisé lorsqu'aucun lieu n'est précisé
+
+def load_profiles(path=profiles_file):
+    """
+    Retourne tous les profils enregistrés (dictionnaire vide si le fichier n'existe pas).
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+def load_profile(camera_name, venue=None, path=profiles_file):
+    """
+    Retourne le profil d'une caméra pour un lieu, ou None s'il n'existe pas.
+
+    Retourne :
+    dict ou None
+        {"low": [h,s,v], "high": [h,s,v], "range_value": int, "hsv_pixel": [h,s,v], "date": str}
+    """
+    return load_profiles(path).get(camera_name, {}).get(venue or default_venue)
+
+def save_profile(camera_name, low_color, high_color, range_value, hsv_pixel, venue=None, path=profiles_file):
+    """
+    Enregistre (ou remplace) le profil d'une caméra pour un lieu, sans modifier les autres profils.
+    """
+    profiles = load_profiles(path)
+    profiles.setdefault(camera_name, {})[venue or default_venue] = {
+        "low": [int(c) for c in low_color],
+        "high": [int(c) for c in high_color],
+        "range_value": int(range_value),
+        "hsv_pixel": [int(c) for c in hsv_pixel],
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(path, "w") as file:
+        json.dump(profiles, file, indent=4, ensure_ascii=False)
+
+def profile_filter_determination(capture, camera_name, venue=None, repick=False, path=profiles_file):
+    """
+    Retourne les bornes HSV d'une caméra à partir de son profil enregistré.
+
+    Si aucun profil n'existe pour cette caméra et ce lieu, ou si 'repick' vaut True, la fenêtre de sélection
+    (filter_determination()) est ouverte, initialisée avec le profil existant s'il y en a un, puis le nouveau
+    filtre est enregistré.
+
+    Retourne :
+    tuple (np.ndarray, np.ndarray)
+        Bornes HSV basses et hautes.
+    """
+    profile = load_profile(camera_name, venue, path)
+
+    if profile is not None and not repick:
+        print(f"Filtre de la caméra \033[34m{camera_name}\033[0m chargé ({venue or default_venue}, {profile['date']})")
+        return np.array(profile["low"], dtype=int), np.array(profile["high"], dtype=int)
+
+    if profile is not None:
+        low_color, high_color, range_value, hsv_pixel = filter_determination(capture, camera_name, profile["range_value"], profile["hsv_pixel"], return_settings=True)
+    else:
+        low_color, high_color, range_value, hsv_pixel = filter_determination(capture, camera_name, return_settings=True)
+
+    save_profile(camera_name, low_color, high_color, range_value, hsv_pixel, venue, path)
+    print(f"Filtre de la caméra \033[34m{camera_name}\033[0m enregistré dans \033[34m{path}\033[0m")
+    return low_color, high_color
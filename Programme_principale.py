@@ -14,26 +14,63 @@ Description :
 # =========================================================================================== #
 
 import cv2
+import sys
+import time
+import signal
 import numpy as np
 from Texte_image import image_display
-from Detection_joueur import final_frame
-from Determination_filtre import filter_determination
+from Capture_cameras import CameraStream, StereoCapture
+from Mesure_latence import StageTimer
+from Affichage_fenetre import DisplayConsumer, CompositeCanvas
+from Suivi_joueur import PlayerTracker
+from Balistique_volant import ballistics_table, launcher_parameters
+from Modele_couleur import AdaptiveColorModel
+from Enregistrement_stereo import StereoRecorder, StereoReplay
+from Detection_joueur import detect_player, render_view, RegionOfInterest, color_lookup_table
+from Profils_filtres import profile_filter_determination, load_profile
+from Calibrage_stereo import load_calibration, vision_field_calibration, baseline_calibration, StereoRectifier
 from Transfert_donnees_lanceur import connection_port, connexion_successful
-from Terrain_badminton import badminton_court, representation, dimension_scale
-from Variables_positions import player_variable, difficulty_variable, permanent_variable, field_of_view
+from Terrain_badminton import badminton_court, CourtRenderer, dimension_scale
+from Variables_positions import player_variable, difficulty_variable, permanent_variable, field_of_view, CameraAngleTable, TargetSampler, angle_position_launcher
 from Interface_utilisateur import ModifiedParameter, input_analysis, difficulty_choice
 
 # =========================================================================================== #
 #                        2. Configuration des caméras et du port série                        #
 # =========================================================================================== #
 
-#--------- Configuration des caméras ---------
-cap_left = cv2.VideoCapture(1)
-cap_right = cv2.VideoCapture(0)
+#--------- Mode sans affichage ---------
+headless_mode = False                                # Mode sans affichage : détection, position du joueur et commande du lanceur uniquement
+headless = headless_mode or "--headless" in sys.argv  # Activable aussi avec l'argument '--headless' au lancement
+headless_report_period = 5                           # Période d'affichage des latences dans la console en mode sans affichage (en s)
 
+#--------- Configuration des caméras ---------
 camera_left = "iPhone"   # Nom de caméra gauche
 camera_right = "Webcam"  # Nom de caméra droite
 
+capture_mode = "Direct"                 # "Direct" : caméras, "Enregistrement" : caméras et enregistrement des images, "Relecture" : relecture d'un enregistrement
+recording_path = "Enregistrements/seance"  # Dossier de l'enregistrement (modes "Enregistrement" et "Relecture")
+replay_realtime = True                  # Relecture à la vitesse d'enregistrement (True) ou aussi vite que possible (False)
+
+recorder = None  # Enregistreur des images (mode "Enregistrement" uniquement)
+
+if capture_mode == "Relecture":
+    # Les images enregistrées remplacent les caméras
+    stereo_capture = StereoReplay(recording_path, replay_realtime)
+    cap_left = stereo_capture.camera(0)
+    cap_right = stereo_capture.camera(1)
+else:
+    # Chaque caméra est lue en continu par son propre thread qui ne garde que les images les plus récentes
+    cap_left = CameraStream(cv2.VideoCapture(1), camera_left)
+    cap_right = CameraStream(cv2.VideoCapture(0), camera_right)
+
+    # Association des images gauche/droite selon leur instant de capture
+    stereo_capture = StereoCapture(cap_left, cap_right)
+
+    if capture_mode == "Enregistrement":
+        recorder = StereoRecorder(recording_path, camera_left, camera_right)
+
+timeout_capture = 0.005  # Attente maximale d'une nouvelle image lorsque aucune n'est arrivée depuis la paire précédente (en s)
+
 problem_camera = False   # Variable indiquant le bon fonctionnement des caméras
 
 #--------- Configuration du port série pour la communication Arduino ---------
@@ -66,14 +103,50 @@ length_screen_webcam = [1.375,1.777,2.678]    # Largeurs de l'écran pour la web
 vision_field_left = field_of_view(distance_iPhone2screen,length_screen_iPhone)
 vision_field_right = field_of_view(distance_webcam2screen,length_screen_webcam)
 
+# Le calibrage stéréo (voir Calibrage_stereo.py), s'il existe, remplace les mesures manuelles
+calibration_path = "Calibrage_stereo.npz"
+calibration = load_calibration(calibration_path)
+rectifier = None  # Correction de la distorsion des positions détectées
+if calibration is not None:
+    vision_field_left = vision_field_calibration(calibration,0)
+    vision_field_right = vision_field_calibration(calibration,1)
+    baseline = baseline_calibration(calibration)
+    baseline_court = int(baseline/scale)
+    rectifier = StereoRectifier(calibration)
+    print(f"Calibrage stéréo chargé depuis \033[34m{calibration_path}\033[0m")
+
+# Tables des angles de chaque colonne des caméras, calculées à la première image (largeur connue) puis
+# recalculées uniquement si la résolution ou le champ de vision change
+angle_table_left = CameraAngleTable(vision_field_left)
+angle_table_right = CameraAngleTable(vision_field_right)
+
 # Définition du champ d'action du lanceur
 scope_launcher = np.pi/2
 
 #--------- Détermination des filtres de couleur ---------
 
-# Détermination des filtres de couleur pour chaque caméra
-low_color_left, high_color_left = filter_determination(cap_left, camera_left)
-low_color_right, high_color_right = filter_determination(cap_right, camera_right)
+venue = None                                  # Lieu ou éclairage du profil de filtres (None : profil par défaut)
+repick_filters = "--filtres" in sys.argv      # Nouvelle sélection des filtres (argument '--filtres' au lancement)
+
+# Sans affichage, aucune fenêtre de sélection ne peut être ouverte : les filtres doivent déjà être enregistrés
+if headless and (repick_filters or load_profile(camera_left, venue) is None or load_profile(camera_right, venue) is None):
+    print("\n\033[31mMode sans affichage : les filtres des deux caméras doivent être enregistrés au préalable (lancement avec affichage)\033[0m\n")
+    stereo_capture.release()
+    sys.exit(1)
+
+# Chargement des filtres de couleur enregistrés pour chaque caméra (sélection interactive si absents ou redemandés)
+low_color_left, high_color_left = profile_filter_determination(cap_left, camera_left, venue, repick_filters)
+low_color_right, high_color_right = profile_filter_determination(cap_right, camera_right, venue, repick_filters)
+
+# Compilation des bornes HSV en tables de correspondance BGR -> masque (partagées si les bornes sont identiques)
+lookup_segmentation = False  # Active la segmentation par table (voir Mesure_performances.py pour choisir la méthode la plus rapide sur la machine)
+lookup_table_left = color_lookup_table(low_color_left, high_color_left) if lookup_segmentation else None
+lookup_table_right = color_lookup_table(low_color_right, high_color_right) if lookup_segmentation else None
+
+# Adaptation progressive des bornes HSV aux variations d'éclairage (autour des bornes chargées ou choisies)
+adaptive_color = True
+color_model_left = AdaptiveColorModel(low_color_left, high_color_left)
+color_model_right = AdaptiveColorModel(low_color_right, high_color_right)
 
 # =========================================================================================== #
 #                             4. Paramétrage des affichages écran                             #
@@ -81,12 +154,27 @@ low_color_right, high_color_right = filter_determination(cap_right, camera_right
 
 #--------- Affichage des caméras ---------
 only_player_detection = True  # Active l'affichage du joueur uniquement. Si False, affiche aussi les formes rouges.
+roi_tracking = True           # Active la recherche du joueur dans une fenêtre autour de sa dernière position (sinon recherche sur l'image entière)
+pyramid_factor = 2            # Réduction de l'image pour la recherche grossière du joueur (1 : pleine résolution, 2 : moitié, 4 : quart)
 text_display = [True]         # Active l'affichage des données du joueur avec des paramètres spécifiques : position de la caméra, profondeur, largeur, angle de la caméra, angle total et angle du lanceur.
 text_color = (0,0,255)        # Couleur du texte affiché
 fontFace = 1                  # Police du texte
 fontScale = 2                 # Taille du texte
 thickness = 2                 # Épaisseur du texte
 
+#--------- Suivi du joueur ---------
+player_tracking = True     # Active l'estimation de la position du joueur (lissage, prédiction et images sans détection)
+tracking_lead_time = 0.3   # Délai entre l'envoi au lanceur et la sortie du volant (en s), le temps de vol du volant est ajouté
+
+#--------- Mesure des latences de la boucle principale ---------
+latency_overlay = False                  # Affichage des latences de chaque étape sur l'image (modifiable avec le préfixe 'S')
+latency_dump_path = "Mesures_boucle.jsonl"  # Fichier d'enregistrement périodique des latences (None pour désactiver)
+latency_dump_period = 5                  # Période d'enregistrement des latences (en s)
+
+#--------- Fenêtre d'affichage ---------
+display_rate = 30      # Fréquence maximale d'affichage (en Hz), indépendante de la fréquence de la boucle principale
+display_thread = True  # Composition de l'image dans un fil séparé (les fenêtres restent gérées par le fil principal)
+
 #--------- Initialisation du terrrain de badminton ---------
 court_initialization_display = [True]  # Initialisation du terrain de badminton avec des paramètres spécifiques : lignes, lanceur, champ d'action du lanceur, caméras et champs de vision des caméras.
 color_court = (183,107,0)              # Couleur du terrain
@@ -116,8 +204,6 @@ level_difficulty = 1  # Niveau de difficulté
 
 #--------- Mise à jour dynamique des variables sur la console Python ---------
 
-camera_display = True                 # Initialisation d'un drapeau pour l'initialisation des images à afficher
-
 selected_frame = "Sans modification"  # Initialisation du variable pour le changement d'affichage caméra
 
 tracking_mode = str(False)            # Mode de suivi du joueur
@@ -130,10 +216,12 @@ frequency_throw = 0                   # Fréquence de lancement des volants
 
 frequency_launcher = 1000             # Fréquence de mise à jour du lanceur
 
-#--------- Variables temporaires ---------
-altitude = 0
-puissance = 0
-# TODO : Faire une fonction qui à l'aide des équations du volant renvoie une altitude et une puissance à envoyer à l'arduino
+#--------- Trajectoire du volant ---------
+ballistics = ballistics_table(launcher_parameters)  # Table altitude/puissance/temps de vol (calculée une seule fois par jeu de paramètres du lanceur)
+altitude = 0                                        # Altitude du lanceur (en degrés)
+puissance = 0                                       # Puissance du lanceur (en %)
+flight_time = 0.3                                   # Temps de vol du volant jusqu'à la cible (en s)
+target_reachable = True                             # False si la cible est hors de portée du lanceur
 
 # =========================================================================================== #
 #                                     6. Boucle principale                                    #
@@ -141,59 +229,170 @@ puissance = 0
 
 # Création du terrain fictif
 court = badminton_court(baseline_court,scope_launcher,vision_field_left,vision_field_right,color_court,color_launcher,color_camera,court_initialization_display)
+# Image composite affichée (terrain et vues des caméras), allouée une seule fois
+canvas = CompositeCanvas(court.shape) if not headless else None
+court_renderer = CourtRenderer(court,baseline_court,color_launcher,color_camera,canvas.court) if not headless else None  # Couche fixe du terrain dessinée une seule fois
 
 real_condition_launcher = False  # Condition réel de l'utilisation du lanceur
 
+target_sampler = TargetSampler()  # Tirages de la position de la difficulté préparés par paquets (coût constant à chaque image)
+
+# Régions d'intérêt de chaque caméra pour le suivi du joueur
+roi_left = RegionOfInterest() if roi_tracking else None
+roi_right = RegionOfInterest() if roi_tracking else None
+
+# Estimation de la position du joueur entre la triangulation et le calcul de la difficulté
+tracker = PlayerTracker()
+
 previous_written_value = 0  # Initialisation de la variable pour stocker la dernière valeur écrite et détecter les changements
 
+# Chronométrage de chaque étape de la boucle
+timer = StageTimer(dump_path=latency_dump_path, dump_period=latency_dump_period)
+
+def render_display(state):
+    """
+    Compose l'image affichée (terrain fictif et vues des deux caméras) à partir d'un état déposé par la boucle principale.
+    """
+    # Génération de la seule vue sélectionnée pour chaque caméra, directement dans l'image composite (redimensionnée si besoin)
+    render_view(state["detection_left"],state["selected_frame"],only_player_detection,canvas.view_left)
+    render_view(state["detection_right"],state["selected_frame"],only_player_detection,canvas.view_right)
+
+    # Application du texte sur chaque vue
+    image_display(canvas.view_left,state["depth_player"],state["width_player"],state["position_left"],state["angle_left"],state["total_angle_left"],state["azimut"],fontFace,fontScale,text_color,thickness,text_display,"Camera Gauche")
+    image_display(canvas.view_right,state["depth_player"],state["width_player"],state["position_right"],state["angle_right"],state["total_angle_right"],state["azimut"],fontFace,fontScale,text_color,thickness,text_display,"Camera Droite")
+
+    # Application des paramètres sur le terrain fictif (dessiné dans sa partie de l'image composite)
+    court_renderer.render(state["position_player_court"],state["position_player_court_base"],state["depth_player"],state["width_player"],state["total_angle_left"],state["total_angle_right"],state["azimut"],state["radius_difficulty_court"],state["position_difficulty_base"],state["position_difficulty_court"],state["azimut_difficulty"],state["position_permanent_court"],color_player_width_height,color_difficulty,color_player2camera,color_angle_camera,color_player2launcher,color_angle_launcher,court_display)
+
+    # Affichage des latences de chaque étape de la boucle principale
+    if state["latency_overlay"]:
+        court_renderer.mark_dirty(timer.overlay(canvas.image))  # Le texte déborde sur le terrain, restauré à l'affichage suivant
+
+    return canvas.image
+
+# Affichage découplé de la boucle : seul le dernier état est affiché, au plus 'display_rate' fois par seconde
+display = DisplayConsumer(render_display, "Position du joueur", display_rate, display_thread) if not headless else None
+
+# Sans affichage, la boucle est arrêtée par Ctrl+C (la touche 'Échap' de la fenêtre n'existe plus)
+stop_requested = False
+last_report = time.monotonic()
+
+def request_stop(signum, frame):
+    """Demande l'arrêt de la boucle principale à la fin de la boucle en cours"""
+    global stop_requested
+    stop_requested = True
+
+if headless:
+    signal.signal(signal.SIGINT, request_stop)
+    print("\033[36mMode sans affichage : appuyer sur Ctrl+C pour quitter\033[0m\n")
+
 while True:
 
-    # Capture des images des caméras
-    ret_left, frame_left = cap_left.read()
-    ret_right, frame_right = cap_right.read()
+    timer.new_loop()
+
+    # Récupération de la paire d'images gauche/droite la mieux synchronisée
+    ret_cameras, frame_left, frame_right, capture_skew, new_pair = stereo_capture.read(timeout_capture)
+    timer.lap("Capture")
 
-    # Vérification que les deux caméras fonctionnent correctement
-    if not ret_left or not ret_right:
+    # Vérification que les deux caméras fonctionnent correctement (ou fin de la relecture)
+    if not ret_cameras:
+        if capture_mode == "Relecture":
+            print("\n\033[36mFin de la relecture de l'enregistrement\033[0m\n")
+            break
         problem_camera = True
         print("\n\033[31mProblème lors de la connexion aux caméras\033[0m\n")
         break
 
+    # Enregistrement des nouvelles paires d'images brutes
+    if recorder is not None and new_pair:
+        recorder.write(frame_left, frame_right, *stereo_capture.last_timestamps)
+        timer.lap("Enregistrement")
+
     # Ajustement du rayon de difficulté en fonction de l'échelle du terrain
     radius_difficulty_court = int(radius_difficulty/scale)
     
-    # Détection du joueur sur chaque caméra
-    frame_figure_left, threshold_left, threshold_figure_left, color_left, color_figure_left, position_left = final_frame(frame_left,low_color_left,high_color_left,only_player_detection)
-    frame_figure_right, threshold_right, threshold_figure_right, color_right, color_figure_right, position_right = final_frame(frame_right,low_color_right,high_color_right,only_player_detection)
+    # Détection du joueur sur chaque caméra (une seule passe, les vues d'affichage sont générées plus tard)
+    detection_left = detect_player(frame_left,low_color_left,high_color_left,roi_left,lookup_table_left,pyramid_factor)
+    detection_right = detect_player(frame_right,low_color_right,high_color_right,roi_right,lookup_table_right,pyramid_factor)
+    position_left, position_right = detection_left.position, detection_right.position
+
+    # Mise à jour des bornes HSV avec les pixels du joueur détecté (la table de correspondance suit si elle est utilisée)
+    if adaptive_color:
+        low_color_left, high_color_left = color_model_left.update(frame_left,detection_left)
+        low_color_right, high_color_right = color_model_right.update(frame_right,detection_right)
+        if lookup_segmentation and color_model_left.changed:
+            lookup_table_left = color_lookup_table(low_color_left, high_color_left)
+        if lookup_segmentation and color_model_right.changed:
+            lookup_table_right = color_lookup_table(low_color_right, high_color_right)
+    timer.lap("Detection")
+
+    # Le calibrage n'est utilisé que si la taille des images correspond (vérifiée sur la première image)
+    if rectifier is not None and not all(rectifier.checked):
+        if not rectifier.check_frame(frame_left,0) or not rectifier.check_frame(frame_right,1):
+            break
+
+    # Correction de la distorsion des positions détectées (uniquement les deux points, pas les images entières)
+    point_left, point_right = position_left, position_right
+    if rectifier is not None:
+        point_left = rectifier.undistort_point(position_left,0)
+        point_right = rectifier.undistort_point(position_right,1)
 
     # Calcul de la position du joueur et des angles réels
-    depth_player,width_player,angle_left,angle_right,total_angle_left,total_angle_right,azimut = player_variable(color_figure_left,baseline,position_left,position_right,vision_field_left,vision_field_right)
-    
+    depth_player,width_player,angle_left,angle_right,total_angle_left,total_angle_right,azimut = player_variable(frame_left,baseline,point_left,point_right,vision_field_left,vision_field_right,angle_table_left,angle_table_right)
+    timer.lap("Triangulation")
+
+    # Position du joueur prédite à l'arrivée du volant (latence de capture et de traitement comprise)
+    # Le filtre n'est corrigé que sur une nouvelle paire : une paire déjà traitée est seulement extrapolée
+    if player_tracking:
+        if new_pair:
+            detected = position_left != (0,0) and position_right != (0,0)
+            estimate = tracker.update(depth_player,width_player,np.mean(stereo_capture.last_timestamps),detected)
+        else:
+            estimate = tracker.estimate()
+        if estimate is not None:
+            processing_delay = time.monotonic() - tracker.timestamp if capture_mode != "Relecture" else 0
+            depth_player, width_player = tracker.predict(processing_delay + tracking_lead_time + flight_time)
+            azimut = angle_position_launcher(depth_player,width_player)
+        timer.lap("Suivi")
+
     # Détermination de la position du joueur et de la difficulté sur le terrain fictif ainsi que l'azimut de la difficulté
-    position_player_court, position_player_court_base, position_difficulty_court, position_difficulty_base, azimut_difficulty = difficulty_variable(court,depth_player,width_player,level_difficulty,radius_difficulty_court,real_condition_launcher)
+    position_player_court, position_player_court_base, position_difficulty_court, position_difficulty_base, azimut_difficulty = difficulty_variable(court,depth_player,width_player,level_difficulty,radius_difficulty_court,real_condition_launcher,target_sampler)
 
     # Détermination de la position de la position de tir permanent sur le terrain fictif ainsi que son azimut
     position_permanent_court, position_permanent_court_base, azimut_permanent = permanent_variable(court,position_permanent)
+    timer.lap("Difficulte")
+
+    # Altitude, puissance et temps de vol du volant pour atteindre la cible (positions en mm)
+    if tracking_mode in ["True","true"]:
+        target_depth, target_width = position_difficulty_base[0]*scale, position_difficulty_base[1]*scale
+    else:
+        target_depth, target_width = position_permanent
+    altitude, puissance, flight_time, reachable = ballistics.lookup(target_depth,target_width)
+    altitude, puissance = round(altitude), round(puissance)
+
+    # Cible hors de portée : le volant est envoyé à la distance atteignable la plus proche (signalé à chaque changement)
+    if reachable != target_reachable:
+        target_reachable = reachable
+        if not reachable:
+            print(f"\033[33mCible hors de portée du lanceur ({np.hypot(target_depth,target_width):.0f} mm) : envoi à la distance atteignable la plus proche\033[0m")
+        else:
+            print("\033[32mCible de nouveau atteignable\033[0m")
+    timer.lap("Balistique")
 
     #--------- Affichage des caméras et du terrain fictif ---------
 
-    # Initialisation des images des caméras à afficher
-    if camera_display:
-        selected_frame_left = frame_figure_left
-        selected_frame_right = frame_figure_right
-        camera_display = False
-
-    # Application du texte sur chaque frame
-    final_frame_left = image_display(selected_frame_left,depth_player,width_player,position_left,angle_left,total_angle_left,azimut,fontFace,fontScale,text_color,thickness,text_display,"Camera Gauche")
-    final_frame_right = image_display(selected_frame_right,depth_player,width_player,position_right,angle_right,total_angle_right,azimut,fontFace,fontScale,text_color,thickness,text_display,"Camera Droite")
-
-    # Application des paramètres sur le terrain fictif
-    final_court = representation(court,baseline_court,position_player_court,position_player_court_base,depth_player,width_player,total_angle_left,total_angle_right,azimut,radius_difficulty_court,position_difficulty_base,position_difficulty_court,azimut_difficulty,position_permanent_court,color_player_width_height,color_difficulty,color_launcher,color_camera,color_player2camera,color_angle_camera,color_player2launcher,color_angle_launcher,court_display)
-
-    # On combine les deux images et le terrain dans une seule image
-    combined = cv2.hconcat([final_court,cv2.vconcat([final_frame_left, final_frame_right])])
-
-    # On affiche l'image créée
-    cv2.imshow("Position du joueur", combined)
+    # Dépôt de l'état à afficher (affiché au plus 'display_rate' fois par seconde, la composition pouvant être faite par un fil séparé)
+    if not headless:
+        display.submit({
+            "detection_left": detection_left, "detection_right": detection_right, "selected_frame": selected_frame,
+            "depth_player": depth_player, "width_player": width_player, "position_left": position_left, "position_right": position_right,
+            "angle_left": angle_left, "angle_right": angle_right, "total_angle_left": total_angle_left, "total_angle_right": total_angle_right, "azimut": azimut,
+            "position_player_court": position_player_court, "position_player_court_base": position_player_court_base,
+            "radius_difficulty_court": radius_difficulty_court, "position_difficulty_base": position_difficulty_base,
+            "position_difficulty_court": position_difficulty_court, "azimut_difficulty": azimut_difficulty,
+            "position_permanent_court": position_permanent_court, "latency_overlay": latency_overlay,
+        })
+        timer.lap("Affichage")
 
     #--------- Envoi des données à l'Arduino ---------
 
@@ -217,6 +416,8 @@ while True:
             if (level != f"{level_difficulty}") and (level in ["1","2","3"]):
                 level_difficulty = int(level)
 
+        timer.lap("Port serie")
+
     #--------- Mise à jour de différents paramètres ---------
 
     # Récupération de la valeur modifiée de la difficulté par l'utilisateur
@@ -277,17 +478,20 @@ while True:
             position_permanent[1] = written_value
             print(f"\033[34mModification de la largeur de la position permanente de tir à {position_permanent[1]}mm\033[0m\n")
 
+        # Activation de l'affichage des latences
+        elif modified_value == 9:
+            latency_overlay = written_value != 0
+            print(f"\033[36mAffichage des latences {'activé' if latency_overlay else 'désactivé'}\033[0m\n")
+
         previous_written_value = index_modification
 
-    if selected_frame == "Sans modification":
-        selected_frame_left, selected_frame_right = frame_figure_left, frame_figure_right
-    elif selected_frame == "Seuillage":
-        selected_frame_left, selected_frame_right = threshold_figure_left, threshold_figure_right
-    elif selected_frame == "Couleur filtrée":
-        selected_frame_left, selected_frame_right = color_figure_left, color_figure_right
-    
-    # Vérifie si l'utilisateur appuie sur la touche 'Échap' pour quitter la boucle principale
-    if cv2.waitKey(1) == 27:
+    # Sans affichage : latences de la boucle affichées périodiquement dans la console
+    if headless and time.monotonic() - last_report >= headless_report_period:
+        print("\n".join(timer.summary()) + "\n")
+        last_report = time.monotonic()
+
+    # Vérifie si l'utilisateur a appuyé sur la touche 'Échap' dans la fenêtre d'affichage (ou sur Ctrl+C sans affichage) pour quitter la boucle principale
+    if stop_requested or (not headless and display.escape):
         break
 
 # =========================================================================================== #
@@ -298,9 +502,18 @@ if connexion_usb:
     ser.close()
     print(f"Fermeture du port \033[34m{port_usb}\033[0m")
 
-cap_left.release()
-cap_right.release()
-cv2.destroyAllWindows()
+if recorder is not None:
+    recorder.close()
+
+if not headless:
+    display.close()
+    print(f"Affichage : {display.displayed} images affichées, {display.dropped} états abandonnés")
+else:
+    print("\n".join(timer.summary()) + "\n")
+
+stereo_capture.release()
+if not headless:
+    cv2.destroyAllWindows()
 
 if not problem_camera:
     print(f'Libération des caméras \033[1mGauche\033[0m : \033[36m"{camera_left}"\033[0m et \033[1mDroite\033[0m : \033[36m"{camera_right}"\033[0m\n')
\ No newline at end of file
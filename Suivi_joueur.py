@@ -0,0 +1,126 @@
+"""
+Nom du fichier : Suivi_joueur.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Ce script estime la position et la vitesse du joueur sur le terrain (profondeur et largeur, en mm) à partir
+    des positions triangulées à chaque image, avec un filtre alpha-bêta à vitesse constante. Il lisse le bruit
+    de détection, prédit la position du joueur à l'instant où le volant arrivera (compensation des latences
+    de capture, de traitement, de l'envoi série et du vol) et comble les images où le joueur n'est pas détecté.
+"""
+
+import numpy as np
+
+class PlayerTracker:
+    """
+    Classe suivant l'état (position, vitesse) du joueur dans le repère du lanceur.
+
+    À chaque image, update() prédit l'état à l'instant de capture puis le corrige avec la mesure si le joueur
+    est détecté. Sans détection, l'état est extrapolé pendant au plus 'max_coast' secondes, puis le suivi est
+    perdu jusqu'à la détection suivante. Une mesure trop éloignée de la prédiction est rejetée (l'état est
+    extrapolé comme sans détection) ; le suivi n'est réinitialisé que si 'reinit_count' mesures rejetées
+    consécutives concordent entre elles (le joueur a réellement été perdu puis retrouvé ailleurs).
+    """
+    def __init__(self, alpha=0.5, beta=0.1, max_coast=0.5, max_speed=8000, gate=2000, reinit_count=3):
+        self.alpha = alpha          # Gain de correction de la position (0 : mesure ignorée, 1 : mesure brute)
+        self.beta = beta            # Gain de correction de la vitesse
+        self.max_coast = max_coast  # Durée maximale d'extrapolation sans détection (en s)
+        self.max_speed = max_speed  # Vitesse maximale d'un joueur (en mm/s)
+        self.gate = gate            # Écart maximal entre mesure et prédiction (en mm), au-delà la mesure est rejetée
+        self.reinit_count = reinit_count  # Nombre de mesures rejetées concordantes avant réinitialisation
+        self.reset()
+
+    def reset(self):
+        """Oublie l'état du joueur (le prochain joueur détecté initialise le suivi)"""
+        self.position = None                # [profondeur, largeur] (en mm)
+        self.velocity = np.zeros(2)         # [vitesse en profondeur, vitesse en largeur] (en mm/s)
+        self.timestamp = None               # Instant de l'état (en s)
+        self.last_detection = None          # Instant de la dernière détection (en s)
+        self.outliers = []                  # Mesures rejetées consécutives
+
+    @property
+    def tracking(self):
+        """True si l'état du joueur est connu (détecté récemment)"""
+        return self.position is not None
+
+    def update(self, depth_player, width_player, timestamp, detected=True):
+        """
+        Met à jour l'état du joueur avec la position triangulée à l'instant de capture 'timestamp'.
+
+        Paramètres :
+        depth_player, width_player : float
+            Position mesurée du joueur (en mm), ignorée si 'detected' est False.
+        timestamp : float
+            Instant de capture des images (en s, horloge monotone).
+        detected : bool
+            True si le joueur est détecté sur les deux caméras.
+
+        Retourne :
+        tuple (float, float) ou None
+            Position estimée [profondeur, largeur] à l'instant 'timestamp', ou None si le suivi est perdu.
+        """
+        detected = detected and np.isfinite(depth_player) and np.isfinite(width_player)
+        measure = np.array([depth_player, width_player], dtype=np.float64)
+
+        # Initialisation du suivi
+        if self.position is None:
+            if detected:
+                self.position = measure
+                self.velocity = np.zeros(2)
+                self.timestamp = timestamp
+                self.last_detection = timestamp
+            return self.estimate()
+
+        # Prédiction à l'instant de capture
+        dt = max(timestamp - self.timestamp, 0)
+        predicted = self.position + self.velocity*dt
+        self.timestamp = timestamp
+
+        # Mesure aberrante (autre objet détecté, erreur de triangulation) : rejetée, sauf si plusieurs mesures
+        # rejetées consécutives concordent, auquel cas le suivi repart de la dernière
+        residual = measure - predicted
+        if detected and np.hypot(*residual) > self.gate:
+            self.outliers.append(measure)
+            self.outliers = self.outliers[-self.reinit_count:]
+            if len(self.outliers) == self.reinit_count and all(np.hypot(*(outlier - measure)) <= self.gate for outlier in self.outliers):
+                self.position = measure
+                self.velocity = np.zeros(2)
+                self.last_detection = timestamp
+                self.outliers = []
+                return self.estimate()
+            detected = False
+
+        if not detected:
+            if timestamp - self.last_detection > self.max_coast:
+                self.reset()
+                return None
+            self.position = predicted
+            return self.estimate()
+
+        self.outliers = []
+
+        # Correction de la position et de la vitesse
+        self.position = predicted + self.alpha*residual
+        if dt > 0:
+            self.velocity = self.velocity + (self.beta/dt)*residual
+            speed = np.hypot(*self.velocity)
+            if speed > self.max_speed:
+                self.velocity *= self.max_speed/speed
+        self.last_detection = timestamp
+
+        return self.estimate()
+
+    def estimate(self):
+        """Retourne la position estimée (profondeur, largeur) à l'instant du dernier état, ou None"""
+        if self.position is None:
+            return None
+        return float(self.position[0]), float(self.position[1])
+
+    def predict(self, lead_time):
+        """
+        Retourne la position prédite (profondeur, largeur) 'lead_time' secondes après le dernier état, ou None.
+        """
+        if self.position is None:
+            return None
+        position = self.position + self.velocity*lead_time
+        return float(position[0]), float(position[1])
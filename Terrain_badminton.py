@@ -10,6 +10,7 @@ Description :
 
 import cv2
 import numpy as np
+from Texte_image import put_text
 from Variables_positions import dimension_scale, player_on_court, dimension_representation
 
 #--------- Convertion des dimensions réelles en pixels ---------
@@ -22,6 +23,27 @@ service_lines = int(1980/scale)
 corridor_back = int(720/scale)
 corridor_side = int(420/scale)
 
+#--------- Rectangles modifiés par les dessins (x_min, y_min, x_max, y_max) ---------
+
+def line_rectangle(start,end,thickness=thickness_lines):
+    """Retourne le rectangle contenant une ligne d'épaisseur 'thickness' (ou un rectangle plein)"""
+    margin = thickness//2 + 2
+    return (min(start[0],end[0])-margin, min(start[1],end[1])-margin, max(start[0],end[0])+margin+1, max(start[1],end[1])+margin+1)
+
+def line_rectangles(start,end,thickness=thickness_lines,step=96):
+    """
+    Retourne les rectangles contenant une ligne découpée en tronçons de 'step' pixels : une ligne oblique est
+    ainsi couverte par une bande de rectangles plutôt que par un seul grand rectangle.
+    """
+    count = max(1, int(np.hypot(end[0]-start[0], end[1]-start[1])//step))
+    points = [(start[0] + (end[0]-start[0])*i//count, start[1] + (end[1]-start[1])*i//count) for i in range(count+1)]
+    return [line_rectangle(points[i],points[i+1],thickness) for i in range(count)]
+
+def circle_rectangle(center,radius,thickness):
+    """Retourne le rectangle contenant un cercle ou un arc de cercle (thickness = -1 pour un disque)"""
+    margin = radius + max(thickness,0)//2 + 2
+    return (center[0]-margin, center[1]-margin, center[0]+margin+1, center[1]+margin+1)
+
 # =========================================================================================== #
 #                                1. Dessin des lignes du terrain                              #
 # =========================================================================================== #
@@ -108,6 +130,8 @@ def launcher(img,color):
 
     cv2.rectangle(img,(int(center_w-rect_dim[0]/2),height),(int(center_w+rect_dim[0]/2),height-rect_dim[1]),color,-1)
 
+    return [line_rectangle((int(center_w-rect_dim[0]/2),height),(int(center_w+rect_dim[0]/2),height-rect_dim[1]),1)]
+
 def cameras(img,baseline,color):
     """
     But : Afficher les caméras sur le terrain.
@@ -120,6 +144,8 @@ def cameras(img,baseline,color):
     cv2.circle(img,(int((width-baseline)/2),height),radius,color,-1)
     cv2.circle(img,(int((width+baseline)/2),height),radius,color,-1)
 
+    return [circle_rectangle((int((width-baseline)/2),height),radius,-1),circle_rectangle((int((width+baseline)/2),height),radius,-1)]
+
 def camera_fov(img,baseline,fov_left,fov_right,color):
     """
     But : Afficher le champ de vision des caméras sous forme de lignes de perspective.
@@ -168,6 +194,8 @@ def player(img,position,color):
 
     cv2.circle(img,position,radius,color,-1)
 
+    return [circle_rectangle(position,radius,-1)]
+
 def difficulty(img,radius,position,position_difficulty,color):
     """
     But : Visualiser le rayon et la position de la difficulté sous forme d'un cercle.
@@ -177,6 +205,8 @@ def difficulty(img,radius,position,position_difficulty,color):
     cv2.circle(img,position,radius,color,thickness_lines)
     cv2.circle(img,position_difficulty,radius_position_difficulty,color,-1)
 
+    return [circle_rectangle(position,radius,thickness_lines),circle_rectangle(position_difficulty,radius_position_difficulty,-1)]
+
 def permanent(img,position,color):
     """
     But : Afficher la position de tir permanente sous forme d'un cercle.
@@ -185,6 +215,8 @@ def permanent(img,position,color):
 
     cv2.circle(img,position,radius,color,-1)
 
+    return [circle_rectangle(position,radius,-1)]
+
 #--------- Lignes reliant le joueur aux caméras et au lanceur ---------
 
 def player_cameras(img,position,baseline,color):
@@ -196,6 +228,8 @@ def player_cameras(img,position,baseline,color):
     cv2.line(img,position,(int((width-baseline)/2),height),color,thickness_lines)
     cv2.line(img,position,(int((width+baseline)/2),height),color,thickness_lines)
 
+    return line_rectangles(position,(int((width-baseline)/2),height)) + line_rectangles(position,(int((width+baseline)/2),height))
+
 def player_launcher(img,position,color):
     """
     But : Afficher une ligne reliant le joueur au lanceur.
@@ -205,6 +239,8 @@ def player_launcher(img,position,color):
     
     cv2.line(img,position,(center_w,height),color,thickness_lines)
 
+    return line_rectangles(position,(center_w,height))
+
 #--------- Lignes schématisant la hauteur et largeur du joueur ---------
 
 def player_height(img,position,color):
@@ -215,6 +251,8 @@ def player_height(img,position,color):
 
     cv2.line(img,position,(position[0],height),color,thickness_lines)
 
+    return [line_rectangle(position,(position[0],height))]
+
 def player_width(img,position,color):
     """
     But : Visualiser la largeur du joueur sur le terrain.
@@ -223,6 +261,8 @@ def player_width(img,position,color):
 
     cv2.line(img,(int(width/2),position[1]),position,color,thickness_lines)
 
+    return [line_rectangle((int(width/2),position[1]),position)]
+
 #--------- Affichage des angles ---------
 
 def angle_cameras(img,baseline,angle_left,angle_right,color):
@@ -235,6 +275,8 @@ def angle_cameras(img,baseline,angle_left,angle_right,color):
     cv2.ellipse(img,(int((width-baseline)/2),height),(radius, radius),0,180,180+np.degrees(angle_left),color,thickness_lines)
     cv2.ellipse(img,(int((width+baseline)/2),height),(radius, radius),0,180,180+np.degrees(angle_right),color,thickness_lines)
 
+    return [circle_rectangle((int((width-baseline)/2),height),radius,thickness_lines),circle_rectangle((int((width+baseline)/2),height),radius,thickness_lines)]
+
 def angle_launcher(img,angle,radius,color):
     """
     But : Visualiser l'angle entre le joueur et le lanceur.
@@ -244,6 +286,8 @@ def angle_launcher(img,angle,radius,color):
 
     cv2.ellipse(img,(center_w,height),(radius, radius),0,270,270+np.degrees(angle),color,thickness_lines)
 
+    return [circle_rectangle((center_w,height),radius,thickness_lines)]
+
 #--------- Affichage des dimensions réelles du joueur sous forme de texte ---------
 
 def text_height_width(img,position,depth_player,width_player,color):
@@ -255,8 +299,13 @@ def text_height_width(img,position,depth_player,width_player,color):
     fontScale = 2
     thickness = 2
     
-    cv2.putText(img,f"{round(width_player)}mm",(abs(int(((width/2)+position[0])/2)),position[1]-10),fontFace,fontScale,color,thickness)
-    cv2.putText(img,f"{round(depth_player)}mm",(position[0]+10,position[1]+int((height-position[1])/2)),fontFace,fontScale,color,thickness)
+    text_width = f"{round(width_player)}mm"
+    text_depth = f"{round(depth_player)}mm"
+    origin_width = (abs(int(((width/2)+position[0])/2)),position[1]-10)
+    origin_depth = (position[0]+10,position[1]+int((height-position[1])/2))
+
+    return [put_text(img,text_width,origin_width,fontFace,fontScale,color,thickness),
+            put_text(img,text_depth,origin_depth,fontFace,fontScale,color,thickness)]
 
 def text_angle_camera(img,baseline,angle_left,angle_right,color):
     """
@@ -270,8 +319,8 @@ def text_angle_camera(img,baseline,angle_left,angle_right,color):
     angle_left = round(np.degrees(angle_left))
     angle_right = round(np.degrees(angle_right))
 
-    cv2.putText(img,f"{angle_left}deg",(int((width-baseline)/2)-165,height-10),fontFace,fontScale,color,thickness)
-    cv2.putText(img,f"{angle_right}deg",(int((width+baseline)/2)+30,height-10),fontFace,fontScale,color,thickness)
+    return [put_text(img,f"{angle_left}deg",(int((width-baseline)/2)-165,height-10),fontFace,fontScale,color,thickness),
+            put_text(img,f"{angle_right}deg",(int((width+baseline)/2)+30,height-10),fontFace,fontScale,color,thickness)]
 
 def text_angle_launcher(img,angle_player,angle_difficulty,color_player,color_difficulty):
     """
@@ -285,8 +334,8 @@ def text_angle_launcher(img,angle_player,angle_difficulty,color_player,color_dif
     angle_player = round(np.degrees(angle_player))
     angle_difficulty = round(np.degrees(angle_difficulty))
 
-    cv2.putText(img,f"{angle_player}deg",(width-120,height-50),fontFace,fontScale,color_player,thickness)
-    cv2.putText(img,f"{angle_difficulty}deg",(width-120,height-10),fontFace,fontScale,color_difficulty,thickness)
+    return [put_text(img,f"{angle_player}deg",(width-120,height-50),fontFace,fontScale,color_player,thickness),
+            put_text(img,f"{angle_difficulty}deg",(width-120,height-10),fontFace,fontScale,color_difficulty,thickness)]
 
 # =========================================================================================== #
 #                               4. Génération et affichage final                              #
@@ -317,64 +366,136 @@ def badminton_court(baseline,scope_launcher,fov_left,fov_right,color_court,color
             camera_fov(court,baseline,fov_left,fov_right,color_camera)
         return court
 
-def representation(court,baseline,position_court,position_court_reality,depth_player,width_player,total_angle_left,total_angle_right,angle_player_launcher,radius_difficulty,position_difficulty_reality,position_difficulty_court,angle_difficulty,permanent_position_court,color_player_width_height,color_difficulty,color_launcher,color_camera,color_player2camera,color_angle_camera,color_player2launcher,color_angle_launcher,display):
+def draw_overlays(img,baseline,position_court,position_court_reality,depth_player,width_player,total_angle_left,total_angle_right,angle_player_launcher,radius_difficulty,position_difficulty_reality,position_difficulty_court,angle_difficulty,permanent_position_court,color_player_width_height,color_difficulty,color_player2camera,color_angle_camera,color_player2launcher,color_angle_launcher,display):
     """
-    Ajoute les différents éléments visuels liés au joueur et aux caméras sur la représentation du terrain de badminton.
+    Dessine directement sur 'img' les différents éléments visuels liés au joueur et aux caméras.
+
+    Retourne :
+    list de tuple
+        Rectangles (x_min, y_min, x_max, y_max) modifiés par les dessins.
     """
-    # Copie de l'image du terrain pour modifications
-    court_mod = np.copy(court)
+    rectangles = []
 
     # Si display est une liste contenant uniquement [True], on l'étend pour afficher tous les éléments
     if display == [True] : 
         display *= 7  # On duplique pour couvrir tous les éléments possibles
 
     # Vérifie si au moins un élément doit être affiché et si le joueur est sur le terrain
-    if set(display) != {False} and player_on_court(court, position_court[1], position_court[0]):
+    if set(display) != {False} and player_on_court(img, position_court[1], position_court[0]):
         # Affichage de l'angle entre le joueur et le lanceur ainsi que l'angle de difficulté
-        text_angle_launcher(court_mod,angle_player_launcher,angle_difficulty,color_angle_launcher,color_difficulty)
+        rectangles += text_angle_launcher(img,angle_player_launcher,angle_difficulty,color_angle_launcher,color_difficulty)
 
         # Affichage des interactions avec les caméras
         if display[0]:
-            angle_cameras(court_mod,baseline,total_angle_left,total_angle_right,color_angle_camera) 
-            player_cameras(court_mod,position_court,baseline,color_player2camera)
-            text_angle_camera(court_mod,baseline,total_angle_left,total_angle_right,color_angle_camera)
+            rectangles += angle_cameras(img,baseline,total_angle_left,total_angle_right,color_angle_camera) 
+            rectangles += player_cameras(img,position_court,baseline,color_player2camera)
+            rectangles += text_angle_camera(img,baseline,total_angle_left,total_angle_right,color_angle_camera)
 
         # Affichage des interactions avec le lanceur
         if display[1]:
             if position_court_reality[0] > 250:
-                angle_launcher(court_mod,angle_player_launcher,250,color_angle_launcher)
+                rectangles += angle_launcher(img,angle_player_launcher,250,color_angle_launcher)
             else:
-                angle_launcher(court_mod,angle_player_launcher,int(position_court_reality[0]*3/4),color_angle_launcher)
-            player_launcher(court_mod,position_court,color_player2launcher)
+                rectangles += angle_launcher(img,angle_player_launcher,int(position_court_reality[0]*3/4),color_angle_launcher)
+            rectangles += player_launcher(img,position_court,color_player2launcher)
 
         # Affichage de la difficulté et de son angle
         if display[2]:
             if position_difficulty_reality[0] > 260:
-                angle_launcher(court_mod,angle_difficulty,260,color_difficulty)
+                rectangles += angle_launcher(img,angle_difficulty,260,color_difficulty)
             else:
-                angle_launcher(court_mod,angle_difficulty,int(position_difficulty_reality[0]*3/4),color_difficulty)
-            player_launcher(court_mod,position_difficulty_court,color_difficulty)
+                rectangles += angle_launcher(img,angle_difficulty,int(position_difficulty_reality[0]*3/4),color_difficulty)
+            rectangles += player_launcher(img,position_difficulty_court,color_difficulty)
 
         # Affichage des dimensions du joueur (hauteur et largeur)
         if display[3]:
-            player_height(court_mod,position_court,color_player_width_height)
-            player_width(court_mod,position_court,color_player_width_height)
-            text_height_width(court_mod,position_court,depth_player,width_player,color_player_width_height)
+            rectangles += player_height(img,position_court,color_player_width_height)
+            rectangles += player_width(img,position_court,color_player_width_height)
+            rectangles += text_height_width(img,position_court,depth_player,width_player,color_player_width_height)
 
         # Affichage du joueur sur le terrain
         if display[4]:
-            player(court_mod,position_court,color_player2camera)
+            rectangles += player(img,position_court,color_player2camera)
 
         # Affichage de la zone de difficulté
         if display[5]:
-            difficulty(court_mod,radius_difficulty,position_court,position_difficulty_court,color_difficulty)
+            rectangles += difficulty(img,radius_difficulty,position_court,position_difficulty_court,color_difficulty)
 
         # Affichage de la position de tir permanante
         if display[6]:
-            permanent(court_mod,permanent_position_court,color_player2camera)
-    
+            rectangles += permanent(img,permanent_position_court,color_player2camera)
+
+    return rectangles
+
+def representation(court,baseline,position_court,position_court_reality,depth_player,width_player,total_angle_left,total_angle_right,angle_player_launcher,radius_difficulty,position_difficulty_reality,position_difficulty_court,angle_difficulty,permanent_position_court,color_player_width_height,color_difficulty,color_launcher,color_camera,color_player2camera,color_angle_camera,color_player2launcher,color_angle_launcher,display):
+    """
+    Ajoute les différents éléments visuels liés au joueur et aux caméras sur une copie de la représentation du terrain de badminton.
+    Pour un affichage à chaque image, CourtRenderer évite la copie de l'image entière.
+    """
+    # Copie de l'image du terrain pour modifications
+    court_mod = np.copy(court)
+
+    draw_overlays(court_mod,baseline,position_court,position_court_reality,depth_player,width_player,total_angle_left,total_angle_right,angle_player_launcher,radius_difficulty,position_difficulty_reality,position_difficulty_court,angle_difficulty,permanent_position_court,color_player_width_height,color_difficulty,color_player2camera,color_angle_camera,color_player2launcher,color_angle_launcher,display)
+
     # Ajout des caméras et du lanceur sur le terrain
     cameras(court_mod,baseline,color_camera)
-    launcher(court,color_launcher)
-
-    return court_mod
\ No newline at end of file
+    launcher(court_mod,color_launcher)
+
+    return court_mod
+
+class CourtRenderer:
+    """
+    Classe affichant le joueur et la difficulté sur le terrain fictif sans redessiner ni copier toute l'image.
+
+    La couche fixe (lignes, filet, champs de vision, caméras et lanceur) est dessinée une seule fois. À chaque
+    image, seuls les rectangles modifiés par les dessins précédents sont restaurés depuis cette couche, puis les
+    éléments mobiles sont dessinés dans une image réutilisée : le coût dépend de ce qui bouge, pas de la taille
+    du terrain.
+    """
+    def __init__(self,court,baseline,color_launcher,color_camera,buffer=None):
+        self.baseline = baseline
+        self.color_launcher = color_launcher
+        self.color_camera = color_camera
+
+        # Couche fixe : terrain avec les caméras et le lanceur
+        self.static = np.copy(court)
+        cameras(self.static,baseline,color_camera)
+        launcher(self.static,color_launcher)
+
+        # Image affichée, réutilisée à chaque appel (éventuellement une partie de l'image composite affichée)
+        if buffer is None:
+            self.buffer = np.copy(self.static)
+        else:
+            self.buffer = buffer
+            self.buffer[...] = self.static
+        self.dirty = []                     # Rectangles modifiés par le dernier affichage
+
+    def restore(self):
+        """Restaure depuis la couche fixe les rectangles modifiés par le dernier affichage"""
+        height, width, _ = self.buffer.shape
+        for x_min, y_min, x_max, y_max in self.dirty:
+            x_min, y_min = max(x_min,0), max(y_min,0)
+            x_max, y_max = min(x_max,width), min(y_max,height)
+            if x_max > x_min and y_max > y_min:
+                self.buffer[y_min:y_max,x_min:x_max] = self.static[y_min:y_max,x_min:x_max]
+        self.dirty = []
+
+    def mark_dirty(self,rectangle):
+        """Ajoute un rectangle (x_min, y_min, x_max, y_max) dessiné par ailleurs sur l'image, à restaurer au prochain affichage"""
+        self.dirty.append(rectangle)
+
+    def render(self,position_court,position_court_reality,depth_player,width_player,total_angle_left,total_angle_right,angle_player_launcher,radius_difficulty,position_difficulty_reality,position_difficulty_court,angle_difficulty,permanent_position_court,color_player_width_height,color_difficulty,color_player2camera,color_angle_camera,color_player2launcher,color_angle_launcher,display):
+        """
+        Retourne le terrain avec les éléments mobiles (mêmes paramètres que representation()).
+        L'image retournée est réutilisée par l'appel suivant : la copier si elle doit être conservée.
+        """
+        self.restore()
+
+        self.dirty = draw_overlays(self.buffer,self.baseline,position_court,position_court_reality,depth_player,width_player,total_angle_left,total_angle_right,angle_player_launcher,radius_difficulty,position_difficulty_reality,position_difficulty_court,angle_difficulty,permanent_position_court,color_player_width_height,color_difficulty,color_player2camera,color_angle_camera,color_player2launcher,color_angle_launcher,display)
+
+        # Les caméras et le lanceur restent au-dessus des éléments mobiles (déjà présents sur la couche fixe)
+        if self.dirty:
+            cameras(self.buffer,self.baseline,self.color_camera)
+            launcher(self.buffer,self.color_launcher)
+
+        return self.buffer
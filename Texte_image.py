@@ -10,42 +10,139 @@ Description :
 
 import cv2
 import numpy as np
+from collections import OrderedDict
+
+# =========================================================================================== #
+#                               Cache des textes déjà dessinés                                #
+# =========================================================================================== #
+
+class TextCache:
+    """
+    Classe conservant les textes déjà dessinés par cv2.putText() (masque des pixels du texte), pour les recopier
+    sur l'image au lieu de les redessiner. Avec le tracé par défaut (LINE_8), les pixels du texte sont opaques :
+    la couleur est copiée sous le masque et le fond n'est pas modifié. Si la version d'OpenCV lisse malgré tout
+    le texte, un simple masque ne redonne pas les mêmes pixels et le texte est alors redessiné par
+    cv2.putText(). Une étiquette n'est dessinée que lorsque son texte
+    change (valeur arrondie différente) ; les étiquettes les moins récemment utilisées sont oubliées au-delà
+    de 'capacity' étiquettes.
+    """
+    def __init__(self, capacity=256):
+        self.capacity = capacity    # Nombre maximal d'étiquettes conservées
+        self.labels = OrderedDict() # (texte, police, taille, couleur, épaisseur) -> (couleur, masque, origine, lissé)
+        self.hits = 0               # Nombre d'étiquettes recopiées depuis le cache
+        self.misses = 0             # Nombre d'étiquettes dessinées
+
+    def label(self, text, fontFace, fontScale, color, thickness):
+        """
+        Retourne l'étiquette d'un texte, dessinée au premier appel.
+
+        Retourne :
+        tuple (np.ndarray, np.ndarray, tuple, bool)
+            Étiquette remplie de la couleur du texte (uint8, de forme (h, w, 3)), masque des pixels du texte
+            (uint8, de forme (h, w)), position (x, y) de l'origine du texte dans l'étiquette et True si le texte
+            est lissé (pixels partiellement couverts).
+        """
+        key = (text, fontFace, fontScale, tuple(color), thickness)
+        entry = self.labels.get(key)
+        if entry is not None:
+            self.labels.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        # Dessin du texte en blanc sur une petite image noire (pixels du texte). Certains caractères dépassent
+        # des dimensions données par cv2.getTextSize() : le texte est dessiné avec une large marge puis recadré.
+        (width, height), baseline = cv2.getTextSize(text, fontFace, fontScale, thickness)
+        margin = height + thickness + 2
+        alpha = np.zeros((height + baseline + 2*margin, width + 2*margin), dtype=np.uint8)
+        cv2.putText(alpha, text, (margin, margin + height), fontFace, fontScale, 255, thickness)
+
+        rows, columns = np.flatnonzero(alpha.any(axis=1)), np.flatnonzero(alpha.any(axis=0))
+        if len(rows) == 0:
+            rows, columns = np.array([margin]), np.array([margin])
+        alpha = alpha[rows[0]:rows[-1]+1, columns[0]:columns[-1]+1]
+        origin = (margin - columns[0], margin + height - rows[0])
+
+        smooth = bool(((alpha > 0) & (alpha < 255)).any())
+        entry = (np.full(alpha.shape + (3,), color, dtype=np.uint8), alpha, origin, smooth)
+
+        self.labels[key] = entry
+        self.misses += 1
+        if len(self.labels) > self.capacity:
+            self.labels.popitem(last=False)
+        return entry
+
+    def put_text(self, img, text, position, fontFace, fontScale, color, thickness):
+        """
+        Écrit un texte sur l'image comme cv2.putText() (même position, mêmes pixels), en recopiant son étiquette.
+
+        Retourne :
+        tuple
+            Rectangle (x_min, y_min, x_max, y_max) de l'étiquette, éventuellement en dehors de l'image.
+        """
+        color_label, mask, origin, smooth = self.label(text, fontFace, fontScale, color, thickness)
+        x_min, y_min = position[0] - origin[0], position[1] - origin[1]
+        x_max, y_max = x_min + mask.shape[1], y_min + mask.shape[0]
+
+        if smooth:
+            cv2.putText(img, text, position, fontFace, fontScale, color, thickness)
+            return (x_min, y_min, x_max, y_max)
+
+        # Copie de la couleur sur les seuls pixels du texte, directement dans l'image (le fond n'est pas modifié)
+        height_img, width_img = img.shape[:2]
+        x0, y0 = max(x_min, 0), max(y_min, 0)
+        x1, y1 = min(x_max, width_img), min(y_max, height_img)
+        if x1 > x0 and y1 > y0:
+            cv2.copyTo(color_label[y0-y_min:y1-y_min, x0-x_min:x1-x_min], mask[y0-y_min:y1-y_min, x0-x_min:x1-x_min], img[y0:y1, x0:x1])
+
+        return (x_min, y_min, x_max, y_max)
+
+text_cache = TextCache()  # Cache partagé par les textes des caméras et du terrain
+
+def put_text(img,text,position,fontFace,fontScale,color,thickness):
+    """
+    Remplace cv2.putText() en recopiant le texte depuis le cache partagé (voir TextCache.put_text()).
+    """
+    return text_cache.put_text(img,text,position,fontFace,fontScale,color,thickness)
+
+# =========================================================================================== #
+#                                Textes affichés sur les caméras                              #
+# =========================================================================================== #
 
 def text_position(img,position,fontFace,fontScale,color,thickness,height):
     """
     Affiche la position du joueur sur l'image.
     """
-    cv2.putText(img,f"Position = {position}",(15,height),fontFace,fontScale,color,thickness)
+    put_text(img,f"Position = {position}",(15,height),fontFace,fontScale,color,thickness)
 
 def text_depth(img,depth_player,fontFace,fontScale,color,thickness,height):
     """
     Affiche la profondeur du joueur sur l'image.
     """
-    cv2.putText(img,f"Profondeur = {round(depth_player)} mm",(15,height),fontFace,fontScale,color,thickness)
+    put_text(img,f"Profondeur = {round(depth_player)} mm",(15,height),fontFace,fontScale,color,thickness)
     
 def text_width(img,width_player,fontFace,fontScale,color,thickness,height):
     """
     Affiche la largeur du joueur sur l'image.
     """
-    cv2.putText(img,f"Largeur = {round(width_player)} mm",(15,height),fontFace,fontScale,color,thickness)
+    put_text(img,f"Largeur = {round(width_player)} mm",(15,height),fontFace,fontScale,color,thickness)
 
 def text_angle(img,angle,fontFace,fontScale,color,thickness,height):
     """
     Affiche l'angle de la caméra sur l'image.
     """
-    cv2.putText(img,f"Angle camera = {round(np.degrees(angle))} deg",(15,height),fontFace,fontScale,color,thickness)
+    put_text(img,f"Angle camera = {round(np.degrees(angle))} deg",(15,height),fontFace,fontScale,color,thickness)
 
 def text_total_angle(img,angle,fontFace,fontScale,color,thickness,height):
     """
     Affiche l'angle total sur l'image.
     """
-    cv2.putText(img,f"Angle total = {round(np.degrees(angle))} deg",(15,height),fontFace,fontScale,color,thickness)
+    put_text(img,f"Angle total = {round(np.degrees(angle))} deg",(15,height),fontFace,fontScale,color,thickness)
 
 def text_azimuth(img,angle,fontFace,fontScale,color,thickness,height):
     """
     Affiche l'azimut du joueur sur l'image.
     """
-    cv2.putText(img,f"Azimut = {round(np.degrees(angle))} deg",(15,height),fontFace,fontScale,color,thickness)
+    put_text(img,f"Azimut = {round(np.degrees(angle))} deg",(15,height),fontFace,fontScale,color,thickness)
 
 def text_layout(img,depth_player,width_player,position,angle,total_angle,azimut,fontFace,fontScale,color,thickness,display):
     """
@@ -0,0 +1,211 @@
+"""
+Nom du fichier : Traitement_differe.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Ce script retraite des séances stéréo enregistrées (une vidéo par caméra) sans caméra branchée.
+    Les images sont découpées en tranches traitées en parallèle par un groupe de processus, chaque tranche
+    enchaînant la détection du joueur, le calcul de sa position et celui de la difficulté. Les positions et
+    azimuts de chaque image sont enregistrés dans un fichier tableau compact (.npy).
+"""
+
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from Detection_joueur import detect_player, RegionOfInterest, color_lookup_table
+from Variables_positions import player_variable_batch, difficulty_variable, dimension_scale, dimension_representation, TargetSampler
+
+# Description d'une image traitée dans le fichier de résultats
+result_dtype = np.dtype([
+    ("frame", np.int32),                                        # Indice de l'image dans les vidéos
+    ("position_left", np.int32, 2), ("position_right", np.int32, 2),  # Position du joueur sur chaque caméra (en pixels)
+    ("depth", np.float32), ("width", np.float32),               # Position réelle du joueur (en mm)
+    ("total_angle_left", np.float32), ("total_angle_right", np.float32),
+    ("azimut", np.float32),                                     # Azimut du joueur par rapport au lanceur (en rad)
+    ("position_difficulty", np.int32, 2),                       # Position de la difficulté dans le repère du lanceur (en pixels du terrain fictif)
+    ("azimut_difficulty", np.float32),                          # Azimut de la difficulté (en rad)
+    ("detected", np.bool_),                                     # True si le joueur est détecté sur les deux caméras
+])
+
+def frame_count(path_left, path_right):
+    """
+    Retourne le nombre d'images exploitables d'une paire de vidéos (le minimum des deux).
+    """
+    counts = []
+    for path in (path_left, path_right):
+        cap = cv2.VideoCapture(path)
+        counts.append(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        cap.release()
+    return min(counts)
+
+def seek_frame(cap, index, margin=250):
+    """
+    Place un lecteur vidéo exactement sur l'image d'indice 'index'.
+
+    Sur une vidéo compressée, CAP_PROP_POS_FRAMES peut se placer sur une image clé voisine (différente pour
+    chaque fichier). La position obtenue est donc relue : si elle ne correspond pas, le lecteur est placé
+    'margin' images plus tôt (jusqu'au début de la vidéo si besoin) puis avance image par image jusqu'à 'index'.
+
+    Retourne :
+    bool
+        True si le lecteur est placé sur l'image demandée.
+    """
+    cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+    if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == index:
+        return True
+
+    # Recherche d'une position connue avant l'image demandée
+    target = index
+    while True:
+        target = max(target - margin, 0)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if position <= index or target == 0:
+            break
+    if position > index:
+        return False
+
+    # Lecture jusqu'à l'image demandée
+    while position < index:
+        if not cap.grab():
+            return False
+        position += 1
+    return True
+
+def process_chunk(path_left, path_right, start, stop, settings):
+    """
+    Traite les images d'indices [start, stop[ d'une paire de vidéos.
+
+    Chaque processus ouvre ses propres lecteurs vidéo et se place exactement sur la première image de sa tranche (seek_frame()).
+    Le suivi par région d'intérêt repart de l'image entière au début de chaque tranche.
+
+    Retourne :
+    np.ndarray (result_dtype)
+        Résultats des images effectivement lues.
+    """
+    cap_left = cv2.VideoCapture(path_left)
+    cap_right = cv2.VideoCapture(path_right)
+    # Les deux vidéos doivent commencer exactement sur la même image
+    for cap, path in ((cap_left, path_left), (cap_right, path_right)):
+        if not seek_frame(cap, start):
+            cap_left.release()
+            cap_right.release()
+            raise RuntimeError(f"Impossible de se placer sur l'image {start} de {path}")
+
+    low_color_left, high_color_left = settings["color_left"]
+    low_color_right, high_color_right = settings["color_right"]
+
+    # Tables de correspondance et régions d'intérêt propres au processus
+    lookup_table_left = color_lookup_table(low_color_left, high_color_left) if settings["lookup_segmentation"] else None
+    lookup_table_right = color_lookup_table(low_color_right, high_color_right) if settings["lookup_segmentation"] else None
+    roi_left = RegionOfInterest() if settings["roi_tracking"] else None
+    roi_right = RegionOfInterest() if settings["roi_tracking"] else None
+
+    # Seules les dimensions du terrain fictif sont utilisées par difficulty_variable()
+    court = np.empty(dimension_representation, dtype=np.uint8)
+    radius_difficulty_court = int(settings["radius_difficulty"]/dimension_scale())
+
+    # Tirages de la difficulté reproductibles si une graine est donnée (une suite différente par tranche)
+    seed = settings.get("seed")
+    sampler = TargetSampler(np.random.default_rng(None if seed is None else (seed, start)))
+
+    results = np.zeros(stop-start, dtype=result_dtype)
+    count = 0
+    width_frame = None
+
+    # Détection du joueur sur chaque image
+    for index in range(start, stop):
+        ret_left, frame_left = cap_left.read()
+        ret_right, frame_right = cap_right.read()
+        if not ret_left or not ret_right:
+            break
+
+        result = results[count]
+        result["frame"] = index
+        result["position_left"] = detect_player(frame_left,low_color_left,high_color_left,roi_left,lookup_table_left,settings["pyramid_factor"]).position
+        result["position_right"] = detect_player(frame_right,low_color_right,high_color_right,roi_right,lookup_table_right,settings["pyramid_factor"]).position
+        width_frame = frame_left.shape[1]
+        count += 1
+
+    results = results[:count]
+
+    # Triangulation de toute la tranche en un seul appel
+    if count > 0:
+        depth_player,width_player,angle_left,angle_right,total_angle_left,total_angle_right,azimut = player_variable_batch(width_frame,settings["baseline"],results["position_left"],results["position_right"],settings["vision_field_left"],settings["vision_field_right"])
+        results["depth"] = depth_player
+        results["width"] = width_player
+        results["total_angle_left"] = total_angle_left
+        results["total_angle_right"] = total_angle_right
+        results["azimut"] = azimut
+        results["detected"] = np.any(results["position_left"] != 0, axis=1) & np.any(results["position_right"] != 0, axis=1)
+
+    # Position de la difficulté (tirage aléatoire propre à chaque image), uniquement si le joueur est détecté et
+    # sa position finie (sinon les champs de la difficulté restent à zéro)
+    for result in results:
+        if not result["detected"] or not np.isfinite(result["depth"]) or not np.isfinite(result["width"]):
+            continue
+        position_difficulty_base, azimut_difficulty = difficulty_variable(court,result["depth"],result["width"],settings["level_difficulty"],radius_difficulty_court,settings["real_condition_launcher"],sampler)[3:5]
+        result["position_difficulty"] = position_difficulty_base
+        result["azimut_difficulty"] = azimut_difficulty
+
+    cap_left.release()
+    cap_right.release()
+
+    return results
+
+def batch_processing(path_left, path_right, output_path, settings, chunk_size=600, workers=None):
+    """
+    Retraite une paire de vidéos enregistrées et enregistre les résultats dans 'output_path' (.npy).
+
+    Paramètres :
+    path_left, path_right : str
+        Vidéos des caméras gauche et droite (images synchronisées une à une).
+    output_path : str
+        Fichier de sortie (tableau structuré result_dtype, lisible avec np.load()).
+    settings : dict
+        Réglages de la séance (voir processing_settings()).
+    chunk_size : int
+        Nombre d'images par tranche confiée à un processus.
+    workers : int ou None
+        Nombre de processus (par défaut, le nombre de cœurs de la machine).
+
+    Retourne :
+    np.ndarray (result_dtype)
+        Résultats de toutes les images, dans l'ordre des vidéos.
+    """
+    total = frame_count(path_left, path_right)
+    starts = list(range(0, total, chunk_size))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = list(executor.map(process_chunk, [path_left]*len(starts), [path_right]*len(starts), starts, [min(start+chunk_size,total) for start in starts], [settings]*len(starts)))
+
+    results = np.concatenate(chunks) if chunks else np.zeros(0, dtype=result_dtype)
+    np.save(output_path, results)
+
+    print(f"{len(results)} images traitées, résultats enregistrés dans \033[34m{output_path}\033[0m")
+    return results
+
+def processing_settings(low_color_left, high_color_left, low_color_right, high_color_right, baseline, vision_field_left, vision_field_right, level_difficulty=1, radius_difficulty=1000, real_condition_launcher=False, roi_tracking=True, pyramid_factor=2, lookup_segmentation=False, seed=None):
+    """
+    Regroupe les réglages d'une séance dans un dictionnaire transmissible aux processus.
+    """
+    return {
+        "color_left": (np.array(low_color_left), np.array(high_color_left)),
+        "color_right": (np.array(low_color_right), np.array(high_color_right)),
+        "baseline": baseline,
+        "vision_field_left": vision_field_left,
+        "vision_field_right": vision_field_right,
+        "level_difficulty": level_difficulty,
+        "radius_difficulty": radius_difficulty,
+        "real_condition_launcher": real_condition_launcher,
+        "roi_tracking": roi_tracking,
+        "pyramid_factor": pyramid_factor,
+        "lookup_segmentation": lookup_segmentation,
+        "seed": seed,
+    }
+
+#--------- Exemple de retraitement d'une séance (commenté pour ne pas l'exécuter automatiquement) ---------
+
+# if __name__ == "__main__":
+#     settings = processing_settings((160,120,70),(179,255,255),(160,120,70),(179,255,255),720,1.13,1.17)
+#     batch_processing("seance_gauche.mp4","seance_droite.mp4","seance_positions.npy",settings)
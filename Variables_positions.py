@@ -9,8 +9,6 @@ Description :
 """
 
 import numpy as np
-from random import uniform
-from math import sqrt
 
 dimension_real = (13400,6100,3)          # Dimensions réelles du terrain (en mm)
 dimension_representation = (2160,984,3)  # Dimensions de l'image de représentation (en pixels), la hauteur est déterminée par la hauteur de deux images de taille (1080, 1920, 3)
@@ -24,23 +22,6 @@ def dimension_scale():
     """
     return dimension_real[0]/dimension_representation[0]
 
-def random_point_circle(depth, width, level, radius):
-    """
-    But : Générer un point aléatoire à l'intérieur d’un cercle pour simuler la dispersion des tirs.
-    """
-    # Génération d'un rayon aléatoire avec une distribution uniforme
-    if level == 2:
-        radius = radius * sqrt(uniform(0, 1))
-    
-    # Génération d'un angle aléatoire entre 0 et 2π
-    random_angle = uniform(0, 2 * np.pi)
-    
-    # Conversion en coordonnées cartésiennes
-    x = width + radius * np.cos(random_angle)
-    y = depth + radius * np.sin(random_angle)
-    
-    return int(x), int(y)
-
 # =========================================================================================== #
 #                                 1. Caractéristiques des caméras                             #
 # =========================================================================================== #
@@ -63,6 +44,52 @@ def focal_length(frame,vision_field):
     focal_length = frame.shape[1]/(2 * np.tan(vision_field/2))
     return focal_length
 
+class CameraAngleTable:
+    """
+    Classe contenant, pour chaque colonne de l'image d'une caméra, l'angle entre la caméra et un joueur situé
+    sur cette colonne, ainsi que l'angle total (angle de base de la caméra compris).
+
+    Les angles ne dépendent que de la colonne, de la largeur de l'image et du champ de vision : la table est
+    calculée une seule fois puis recalculée uniquement si la résolution ou le champ de vision change.
+    Les abscisses non entières sont interpolées linéairement entre deux colonnes.
+    """
+    def __init__(self, vision_field, width_frame=None):
+        self.vision_field = vision_field  # Champ de vision horizontal de la caméra (en rad)
+        self.width_frame = None           # Largeur de l'image (en pixels), connue à la première image
+        self.columns = None               # Abscisses des colonnes (0 à largeur incluse)
+        self.angles = None                # Angle caméra/joueur de chaque colonne
+        self.total_angles = None          # Angle total de chaque colonne
+        if width_frame is not None:
+            self.update(width_frame)
+
+    def update(self, width_frame, vision_field=None):
+        """Recalcule la table si la largeur de l'image ou le champ de vision a changé"""
+        if vision_field is None:
+            vision_field = self.vision_field
+        if width_frame == self.width_frame and vision_field == self.vision_field:
+            return
+
+        self.width_frame = width_frame
+        self.vision_field = vision_field
+        self.columns = np.arange(width_frame+1, dtype=np.float64)
+        self.angles = angle_camera_player_batch(self.columns,width_frame,vision_field)
+        self.total_angles = total_angle(self.angles,angle_base_camera(vision_field))
+
+    def lookup(self, table, x):
+        """Lit la table pour des abscisses entières (indexation) ou non entières (interpolation)"""
+        x = np.asarray(x)
+        if x.dtype.kind in "iu":
+            return table.take(x,mode="clip")
+        return np.interp(x,self.columns,table)
+
+    def angle(self, x):
+        """Retourne l'angle entre la caméra et le joueur pour des abscisses 'x' (en pixels)"""
+        return self.lookup(self.angles,x)
+
+    def total_angle(self, x):
+        """Retourne l'angle total (angle de base de la caméra compris) pour des abscisses 'x' (en pixels)"""
+        return self.lookup(self.total_angles,x)
+
 # =========================================================================================== #
 #                             2. Calculs des paramètres du joueur                             #
 # =========================================================================================== #
@@ -73,16 +100,7 @@ def angle_camera_player(frame,position,vision_field):
     """
     Calcule l'angle entre la caméra et un joueur basé sur sa position sur le cadre et l'angle de vision de la caméra.
     """
-    focal = focal_length(frame,vision_field)
-    width_frame = frame.shape[1]
-    center_width_frame = width_frame/2
-    x = position[0]
-
-    # Calcul de l'angle basé sur la position relative du joueur par rapport au centre de l'image
-    if position[0] < center_width_frame:
-        return (vision_field/2)-np.atan((center_width_frame-x)/focal)
-    else:
-        return (vision_field/2)+np.atan((x-center_width_frame)/focal)
+    return angle_camera_player_batch(position[0],frame.shape[1],vision_field)[()]
 
 def angle_base_camera(vision_field):
     """
@@ -110,20 +128,62 @@ def depth(angle_left,angle_right,baseline):
     """
     Calcule la profondeur d'un joueur sur le terrain en utilisant les angles de caméra gauche et droite, ainsi que la distance de base entre les caméras.
     """
-    tal = np.tan(angle_left)
-    tar = np.tan(angle_right)
-
-    return (baseline*tal*tar)/(tal-tar) 
+    return depth_batch(angle_left,angle_right,baseline)[()]
 
 def width(angle_left,angle_right,baseline):
     """
     Calcule la largeur du joueur (distance horizontale) à partir des angles de la caméra gauche et droite.
     """
-    tal = np.tan(angle_left)
-    bl = baseline/2
-    d = depth(angle_left,angle_right,baseline)
-    
-    return -((d/tal)+bl)
+    return width_batch(angle_left,depth(angle_left,angle_right,baseline),baseline)[()]
+
+#--------- Calculs vectorisés (plusieurs positions à la fois) ---------
+
+def angle_camera_player_batch(x,width_frame,vision_field):
+    """
+    Calcule l'angle entre la caméra et le joueur pour un tableau d'abscisses (en pixels) sur l'image.
+
+    Paramètres :
+    x : float ou np.ndarray
+        Abscisses des positions du joueur sur l'image.
+    width_frame : int
+        Largeur de l'image (en pixels).
+    vision_field : float
+        Champ de vision horizontal de la caméra (en rad).
+
+    Retourne :
+    np.ndarray
+        Angles (en rad), de même forme que 'x'.
+    """
+    focal = width_frame/(2 * np.tan(vision_field/2))
+    return (vision_field/2) + np.atan((np.asarray(x, dtype=np.float64) - width_frame/2)/focal)
+
+def depth_batch(angle_left,angle_right,baseline):
+    """
+    Calcule les profondeurs à partir de tableaux d'angles totaux gauche et droit.
+    Les angles égaux (rayons parallèles) donnent une profondeur infinie ou indéterminée, sans avertissement.
+    """
+    tal = np.tan(np.asarray(angle_left, dtype=np.float64))
+    tar = np.tan(np.asarray(angle_right, dtype=np.float64))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (baseline*tal*tar)/(tal-tar)
+
+def width_batch(angle_left,depth_player,baseline):
+    """
+    Calcule les largeurs à partir des angles totaux gauches et des profondeurs déjà calculées.
+    """
+    tal = np.tan(np.asarray(angle_left, dtype=np.float64))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -((depth_player/tal)+baseline/2)
+
+def angle_position_launcher_batch(depth_player,width_player):
+    """
+    Calcule les azimuts par rapport au lanceur ; l'azimut vaut 0 lorsque la profondeur est nulle.
+    """
+    depth_player = np.asarray(depth_player, dtype=np.float64)
+    ratio = np.divide(width_player, depth_player, out=np.zeros(np.broadcast(depth_player, width_player).shape), where=depth_player != 0)
+    return np.atan(ratio)
 
 # =========================================================================================== #
 #                        3. Gestion des positions sur le terrain fictif                       #
@@ -156,9 +216,13 @@ def position_on_court(img,depth_player,width_player):
         x = int((width_img/2) + width_player)  # Joueur à droite du centre
     return x, y
 
-def position_difficulty_on_court(frame, depth, width, level, radius, real_condition_launcher):
+def position_difficulty_on_court(frame, depth, width, level, radius, real_condition_launcher, sampler=None):
     """
     Détermine la position de la difficulté sur le terrain en fonction du niveau choisi.
+
+    Le point est tiré directement dans l'intersection du disque (niveau 2) ou du cercle (niveau 3) avec la zone
+    autorisée du terrain, en un temps borné. Un TargetSampler peut être fourni pour utiliser des tirages
+    préparés à l'avance (et un générateur aléatoire initialisé).
     """
     height_frame, width_frame, _ = frame.shape
     center_h = int(height_frame/2)  # Calcul du centre en hauteur
@@ -172,15 +236,115 @@ def position_difficulty_on_court(frame, depth, width, level, radius, real_condit
     # Si le niveau de difficulté est 1, on garde la position initiale
     if level == 1:
         return width, depth 
-    else :
-        # Génération d'une position aléatoire dans un rayon autour de la position initiale
-        x, y = random_point_circle(depth, width, level, radius)
+    if sampler is not None:
+        return sampler.sample(depth, width, level, radius, width_frame, depth_max)
+    return random_point_region(depth, width, level, radius, width_frame, depth_max)
 
-        # Vérification que la position générée est bien dans les limites du terrain
-        while (x not in range(0,width_frame)) or (y not in range(0,depth_max)):
-            x, y = random_point_circle(depth, width, level, radius)
+#--------- Tirage de la difficulté en temps borné ---------
 
-        return x, y
+difficulty_rng = np.random.default_rng()  # Générateur aléatoire par défaut des positions de difficulté
+
+def clip_region(x, y, width_frame, depth_max):
+    """
+    Ramène un point dans la zone autorisée [0, width_frame[ x [0, depth_max[ (point le plus proche).
+    """
+    x = min(max(int(x), 0), width_frame-1)
+    y = min(max(int(y), 0), max(depth_max-1, 0))
+    return x, y
+
+def random_point_disc_region(depth, width, radius, width_frame, depth_max, rng=difficulty_rng):
+    """
+    Tire un point uniformément dans l'intersection du disque de centre (width, depth) et de la zone autorisée.
+
+    Chaque colonne entière du disque est choisie avec une probabilité proportionnelle à la longueur de sa
+    corde dans la zone autorisée (fonction de répartition par colonne), puis le point est tiré uniformément
+    sur cette corde. Si l'intersection est vide, le centre ramené dans la zone est renvoyé.
+    """
+    columns = np.arange(max(int(np.ceil(width - radius)), 0), min(int(np.floor(width + radius)), width_frame-1) + 1)
+    half_chord = np.sqrt(np.maximum(radius**2 - (columns - width)**2, 0))
+    low = np.maximum(depth - half_chord, 0)
+    high = np.minimum(depth + half_chord, depth_max - 1)
+    lengths = np.maximum(high - low, 0)
+
+    total = lengths.sum()
+    if total <= 0:
+        return clip_region(width, depth, width_frame, depth_max)
+
+    cumulative = np.cumsum(lengths)
+    index = min(int(np.searchsorted(cumulative, rng.uniform(0, total), side="right")), len(columns)-1)
+    y = rng.uniform(low[index], high[index])
+
+    return clip_region(columns[index], y, width_frame, depth_max)
+
+def random_point_circle_region(depth, width, radius, width_frame, depth_max, rng=difficulty_rng, arcs=720):
+    """
+    Tire un point uniformément sur la partie du cercle de centre (width, depth) située dans la zone autorisée.
+
+    Le cercle est découpé en 'arcs' arcs de même longueur : un arc est choisi parmi ceux dont le milieu est
+    dans la zone, puis un angle uniforme dans cet arc. Si aucun arc n'est dans la zone, le centre ramené dans
+    la zone est renvoyé.
+    """
+    step = 2*np.pi/arcs
+    angles = (np.arange(arcs) + 0.5)*step
+    x = width + radius*np.cos(angles)
+    y = depth + radius*np.sin(angles)
+    inside = np.flatnonzero((x >= 0) & (x < width_frame) & (y >= 0) & (y < depth_max))
+
+    if len(inside) == 0:
+        return clip_region(width, depth, width_frame, depth_max)
+
+    angle = angles[inside[rng.integers(len(inside))]] + rng.uniform(-step/2, step/2)
+    return clip_region(width + radius*np.cos(angle), depth + radius*np.sin(angle), width_frame, depth_max)
+
+def random_point_region(depth, width, level, radius, width_frame, depth_max, rng=difficulty_rng):
+    """
+    Tire la position de la difficulté dans la zone autorisée : dans le disque (niveau 2) ou sur le cercle (niveau 3).
+    """
+    if level == 2:
+        return random_point_disc_region(depth, width, radius, width_frame, depth_max, rng)
+    return random_point_circle_region(depth, width, radius, width_frame, depth_max, rng)
+
+class TargetSampler:
+    """
+    Classe préparant à l'avance des tirages de difficulté pour un coût constant à chaque image.
+
+    Des déplacements aléatoires (pour un rayon unité) sont tirés par paquets dans le disque et sur le cercle.
+    À chaque image, les 'chunk' déplacements suivants sont mis à l'échelle du rayon et testés ensemble : le
+    premier point dans la zone autorisée est retenu, ce qui donne un point uniforme dans l'intersection. Si
+    aucun ne convient (joueur près d'une ligne), le tirage exact en temps borné est utilisé.
+    """
+    def __init__(self, rng=None, batch=4096, chunk=32):
+        self.rng = rng if rng is not None else np.random.default_rng()  # Générateur aléatoire (initialisable pour rejouer une séance)
+        self.batch = batch    # Nombre de déplacements préparés à chaque remplissage
+        self.chunk = chunk    # Nombre de déplacements testés à chaque tirage
+        self.offsets = {}     # Déplacements préparés pour chaque niveau : tableau (batch, 2) [dx, dy]
+        self.index = {}       # Indice du prochain déplacement à utiliser pour chaque niveau
+
+    def refill(self, level):
+        """Prépare un nouveau paquet de déplacements pour un rayon unité"""
+        angles = self.rng.uniform(0, 2*np.pi, self.batch)
+        radii = np.sqrt(self.rng.uniform(0, 1, self.batch)) if level == 2 else np.ones(self.batch)
+        self.offsets[level] = np.stack([radii*np.cos(angles), radii*np.sin(angles)], axis=-1)
+        self.index[level] = 0
+
+    def sample(self, depth, width, level, radius, width_frame, depth_max):
+        """
+        Retourne la position (x, y) de la difficulté autour du point (width, depth), dans la zone autorisée.
+        """
+        if level not in self.offsets or self.index[level] + self.chunk > self.batch:
+            self.refill(level)
+
+        start = self.index[level]
+        points = self.offsets[level][start:start+self.chunk]*radius + (width, depth)
+        inside = (points[:,0] >= 0) & (points[:,0] < width_frame) & (points[:,1] >= 0) & (points[:,1] < depth_max)
+
+        if not inside.any():
+            self.index[level] = start + self.chunk
+            return random_point_region(depth, width, level, radius, width_frame, depth_max, self.rng)
+
+        first = int(np.argmax(inside))
+        self.index[level] = start + first + 1
+        return int(points[first,0]), int(points[first,1])
 
 def position_court_base(img,position_on_court):
     """
@@ -198,29 +362,66 @@ def position_court_base(img,position_on_court):
 #                         4. Centralisation des différentes variables                         #
 # =========================================================================================== #
 
-def player_variable(frame,baseline,position_left,position_right,vision_field_left,vision_field_right):
+def player_variable(frame,baseline,position_left,position_right,vision_field_left,vision_field_right,angle_table_left=None,angle_table_right=None):
     """
     Calcule diverses variables du joueur (profondeur, largeur, angles) en fonction des positions des caméras et des champs de vision.
+    Les tables d'angles des caméras (CameraAngleTable), si elles sont fournies, remplacent le calcul des angles.
     """
-    angle_bc_left = angle_base_camera(vision_field_left)
-    angle_bc_right = angle_base_camera(vision_field_right)
+    variables = player_variable_batch(frame.shape[1],baseline,position_left,position_right,vision_field_left,vision_field_right,angle_table_left,angle_table_right)
 
-    angle_left = angle_camera_player(frame,position_left,vision_field_left)
-    angle_right = angle_camera_player(frame,position_right,vision_field_right)
+    return tuple(variable[()] for variable in variables)
 
-    total_angle_left = total_angle(angle_left,angle_bc_left)
-    total_angle_right = total_angle(angle_right,angle_bc_right)
-    
-    depth_player = depth(total_angle_left,total_angle_right,baseline)
-    width_player = width(total_angle_left,total_angle_right,baseline) 
+def player_variable_batch(width_frame,baseline,positions_left,positions_right,vision_field_left,vision_field_right,angle_table_left=None,angle_table_right=None):
+    """
+    Calcule les variables du joueur pour un ensemble de paires de positions gauche/droite en un seul appel.
+
+    Paramètres :
+    width_frame : int
+        Largeur des images des caméras (en pixels).
+    baseline : float
+        Distance entre les deux caméras (en mm).
+    positions_left, positions_right : np.ndarray
+        Positions du joueur sur chaque caméra, de forme (..., 2) ; seules les abscisses sont utilisées.
+    vision_field_left, vision_field_right : float
+        Champs de vision des caméras (en rad).
+    angle_table_left, angle_table_right : CameraAngleTable ou None
+        Tables d'angles des caméras, mises à jour si besoin puis lues à la place du calcul des angles.
+
+    Retourne :
+    tuple (np.ndarray, ...)
+        Profondeurs, largeurs, angles gauches et droits, angles totaux gauches et droits, azimuts,
+        dans le même ordre que player_variable() et de forme (...).
+    """
+    x_left = np.asarray(positions_left)[...,0]
+    x_right = np.asarray(positions_right)[...,0]
+
+    if angle_table_left is not None:
+        angle_table_left.update(width_frame,vision_field_left)
+        angle_left = angle_table_left.angle(x_left)
+        total_angle_left = angle_table_left.total_angle(x_left)
+    else:
+        angle_left = angle_camera_player_batch(x_left,width_frame,vision_field_left)
+        total_angle_left = total_angle(angle_left,angle_base_camera(vision_field_left))
+
+    if angle_table_right is not None:
+        angle_table_right.update(width_frame,vision_field_right)
+        angle_right = angle_table_right.angle(x_right)
+        total_angle_right = angle_table_right.total_angle(x_right)
+    else:
+        angle_right = angle_camera_player_batch(x_right,width_frame,vision_field_right)
+        total_angle_right = total_angle(angle_right,angle_base_camera(vision_field_right))
+
+    depth_player = depth_batch(total_angle_left,total_angle_right,baseline)
+    width_player = width_batch(total_angle_left,depth_player,baseline)
 
-    azimut = angle_position_launcher(depth_player,width_player)
+    azimut = angle_position_launcher_batch(depth_player,width_player)
 
     return depth_player,width_player,angle_left,angle_right,total_angle_left,total_angle_right,azimut
 
-def difficulty_variable(frame,depth_player,width_player,level_difficulty,radius_difficulty,real_condition_launcher):
+def difficulty_variable(frame,depth_player,width_player,level_difficulty,radius_difficulty,real_condition_launcher,sampler=None):
     """
     Calcule les variables de difficulté en fonction de la position du joueur et des paramètres de difficulté du jeu.
+    Un TargetSampler peut être fourni pour tirer la position de la difficulté (voir position_difficulty_on_court()).
     """
     position_player_court = position_on_court(frame,depth_player,width_player)
     position_player_court_base = position_player_court
@@ -228,7 +429,7 @@ def difficulty_variable(frame,depth_player,width_player,level_difficulty,radius_
     position_difficulty_base = position_player_court
     if player_on_court(frame, position_player_court[1], position_player_court[0]):
         position_player_court_base = position_court_base(frame,position_player_court)
-        position_difficulty_court = position_difficulty_on_court(frame,position_player_court[1],position_player_court[0],level_difficulty,radius_difficulty,real_condition_launcher)
+        position_difficulty_court = position_difficulty_on_court(frame,position_player_court[1],position_player_court[0],level_difficulty,radius_difficulty,real_condition_launcher,sampler)
         position_difficulty_base = position_court_base(frame,position_difficulty_court)
 
     azimut_difficulty = angle_position_launcher(position_difficulty_base[0],position_difficulty_base[1])
@@ -0,0 +1,31 @@
+"""
+Nom du fichier : test_determination_filtre.py
+Auteur : CAPRON Aurélien
+Date : 17/10/2026
+Description :
+    Tests de la recherche automatique des bornes HSV sur des images synthétiques.
+"""
+
+import cv2
+import numpy as np
+from Determination_filtre import hsv_stack, evaluate_filter, cached_filter_determination, parallel_filter_determination
+
+def dark_player_frames(count=4):
+    """Images BGR d'un joueur rouge trop sombre pour être retenu par les bornes testées"""
+    frames = []
+    for _ in range(count):
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        cv2.rectangle(frame, (60, 30), (100, 90), (0, 0, 40), -1)
+        frames.append(frame)
+    return frames
+
+def test_empty_crop_is_unstable():
+    hsv, valid, offset = hsv_stack(dark_player_frames(), (161,145,75), (179,255,255))
+    assert hsv.size == 0
+    assert evaluate_filter(hsv, valid, offset, (165,150,80)) == (False, 0.0, 0)
+
+def test_cached_search_without_matching_pixels():
+    assert cached_filter_determination(dark_player_frames()) == []
+
+def test_parallel_search_without_matching_pixels():
+    assert parallel_filter_determination(dark_player_frames(), workers=1) == []